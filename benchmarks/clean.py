@@ -0,0 +1,60 @@
+"""
+Compares Reader.clean with the former rule-by-rule substitution loop.
+
+Run from the repository root: `python -m benchmarks.clean`
+"""
+import os
+import random
+import timeit
+
+import motus.dic
+from motus.dictools import Reader
+
+SUBS_FR = os.path.join(os.path.dirname(motus.dic.__file__), 'subs_fr.txt')
+
+
+def legacy_clean(substitutions, line):
+    # Former Reader.clean, with its bound fixed to accept Z like the new one
+    word = line.strip().upper()
+    for old, new in substitutions.items():
+        word = word.replace(old, new)
+
+    if word == '':
+        return None
+
+    if (ord(min(word)) > 64 and ord(max(word)) < 91):
+        return word
+    raise ValueError(word)
+
+
+def sample_lines(substitutions, count, seed=0):
+    rng = random.Random(seed)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ' * 4 + ''.join(substitutions)
+    return [''.join(rng.choice(letters)
+                    for _ in range(rng.randint(5, 12))).lower() + '\n'
+            for _ in range(count)]
+
+
+def main(count=200000, repeat=5):
+    rd = Reader(config=SUBS_FR)
+    substitutions = dict(rd._substitutions)
+    lines = sample_lines(substitutions, count)
+    assert ([legacy_clean(substitutions, line) for line in lines]
+            == [rd.clean(line) for line in lines])
+
+    timings = {
+        'rule loop': min(timeit.repeat(
+            lambda: [legacy_clean(substitutions, line) for line in lines],
+            number=1, repeat=repeat)),
+        'compiled': min(timeit.repeat(
+            lambda: [rd.clean(line) for line in lines],
+            number=1, repeat=repeat)),
+    }
+    print(f'{count} lines, {len(substitutions)} substitution rules')
+    for name, seconds in timings.items():
+        print(f'{name:>10}: {seconds:.3f} s  '
+              f'({count / seconds:,.0f} lines/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Compares evaluate_batch with one evaluate call per word of a universe.
+
+Run from the repository root: `python -m benchmarks.evaluate [words]`
+"""
+import random
+import sys
+import timeit
+
+from motus.motus import encode_words, evaluate, evaluate_batch
+
+
+def main(count=50000, wordlength=8, seed=0):
+    rng = random.Random(seed)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    # A round universe: every word shares the initial of the solution
+    words = ['B' + ''.join(rng.choice(letters)
+                           for _ in range(wordlength - 1))
+             for _ in range(count)]
+    solutions = encode_words(words)
+    guess = words[0]
+
+    loop = min(timeit.repeat(lambda: [evaluate(word, guess)
+                                      for word in words],
+                             number=1, repeat=3))
+    batch = min(timeit.repeat(lambda: evaluate_batch(solutions, guess),
+                              number=1, repeat=3))
+    print(f'{count} words of {wordlength} letters')
+    print(f'evaluate loop:  {loop * 1000:8.1f} ms')
+    print(f'evaluate_batch: {batch * 1000:8.1f} ms  ({loop / batch:.0f}x)')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,35 @@
+"""
+Measures text dictionary parsing throughput for several worker counts.
+
+Run from the repository root: `python -m benchmarks.parse [lines]`
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from motus.dictools import Reader
+
+
+def main(count=1000000, seed=0):
+    rng = random.Random(seed)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'words.txt')
+        with open(path, 'w') as file:
+            file.writelines(''.join(rng.choice(letters)
+                                    for _ in range(rng.randint(5, 12)))
+                            + '\n' for _ in range(count))
+
+        print(f'{count} lines, {os.cpu_count()} cores')
+        for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            Reader(path).parse(workers=workers)
+            seconds = time.perf_counter() - start
+            print(f'{workers:>3} workers: {seconds:.2f} s  '
+                  f'({count / seconds:,.0f} lines/s)')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
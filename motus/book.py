@@ -0,0 +1,127 @@
+import json
+
+from motus.cache import DicCache, words_digest
+from motus.motus import evaluate_code
+
+
+BOOK_VERSION = 1
+DEFAULT_DEPTH = 2
+
+
+class OpeningBook:
+    """First moves of a deterministic Strategy. \n
+    `moves`: {digest of the candidates: guess}, see `words_digest`, for
+    the games with less than `depth` hints given. The candidates are the
+    ones of a `SolverState`, in universe order, so a game started from a
+    booked universe finds its moves whatever the dictionary it comes from.
+    """
+    def __init__(self, moves=None, depth=DEFAULT_DEPTH):
+        self.moves = dict(moves or {})
+        self.depth = depth
+
+    def __len__(self):
+        return len(self.moves)
+
+    def get(self, state):
+        """Returns the booked guess of a SolverState, `None` if the game is
+        not in the book"""
+        if len(state.history) >= self.depth or not state.candidates:
+            return None
+        return self.moves.get(words_digest(state.candidates))
+
+    def update(self, other):
+        """Adds the moves of another book of the same depth"""
+        self.moves.update(other.moves)
+
+    @classmethod
+    def build(cls, strategy, universes, depth=DEFAULT_DEPTH):
+        """Plays the strategy on every hint of its first `depth` guesses. \n
+        `universes`: iterables of same-length words, the candidates of a
+        new game, typically the words of a length sharing an initial"""
+        book = cls(depth=depth)
+        for universe in universes:
+            book._add(strategy, tuple(universe), depth)
+        return book
+
+    @staticmethod
+    def universes(words):
+        """Returns the lists of the words sharing an initial, in the order
+        of the words. In a round, the initial of the solution is known."""
+        universes = dict()
+        for word in words:
+            universes.setdefault(word[0], []).append(word)
+        return list(universes.values())
+
+    def _add(self, strategy, candidates, depth):
+        if depth <= 0 or len(candidates) <= 1:
+            return
+        guess = strategy.guess(candidates)
+        self.moves[words_digest(candidates)] = guess
+
+        buckets = dict()
+        for word in candidates:
+            if word != guess:
+                buckets.setdefault(evaluate_code(word, guess), []).append(
+                    word)
+        for bucket in buckets.values():
+            self._add(strategy, tuple(bucket), depth - 1)
+
+    def dump(self, file):
+        json.dump({'version': BOOK_VERSION, 'depth': self.depth,
+                   'moves': self.moves}, file, sort_keys=True)
+
+    @classmethod
+    def load(cls, file):
+        """Reads a book written by `dump`, raises `ValueError` if it is not
+        a book of this version"""
+        content = json.load(file)
+        if (not isinstance(content, dict)
+                or content.get('version') != BOOK_VERSION):
+            raise ValueError('Not an opening book of version '
+                             f'{BOOK_VERSION}')
+        return cls(content['moves'], content['depth'])
+
+    @classmethod
+    def cached(cls, strategy, words, depth=DEFAULT_DEPTH, cache=None):
+        """Returns the book of the words of a length, one universe per
+        initial, loaded from the cache directory or built and stored first.
+        \n
+        Books are identified by the words and the `repr` of the strategy,
+        which must tell apart the strategies guessing differently.\n
+        `cache`: DicCache, the user cache directory by default"""
+        words = list(words)
+        cache = cache or DicCache()
+        key = cache.key('book', words_digest(words), repr(strategy), depth,
+                        BOOK_VERSION)
+
+        path = cache.get(key, '.json')
+        if path is not None:
+            try:
+                with open(path) as file:
+                    return cls.load(file)
+            except (OSError, ValueError, KeyError):
+                cache.invalidate(key, '.json')
+
+        book = cls.build(strategy, cls.universes(words), depth)
+        cache.put(key, lambda tmp: book._write(tmp), '.json')
+        return book
+
+    def _write(self, path):
+        with open(path, 'w') as file:
+            self.dump(file)
+
+    @classmethod
+    def from_dic(cls, dic, strategy, lengths, depth=DEFAULT_DEPTH,
+                 cache=True):
+        """Returns the book of some word lengths of a Dic. \n
+        `cache`: bool or DicCache, persists the book of each length in a
+        cache directory"""
+        book = cls(depth=depth)
+        for length in lengths:
+            words = list(dic.iter_prefix('', length))
+            if not cache:
+                book.update(cls.build(strategy, cls.universes(words), depth))
+            else:
+                book.update(cls.cached(strategy, words, depth,
+                                       None if cache is True else cache))
+        return book
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import tempfile
+
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+def cache_dir():
+    """Returns the user cache directory of motus. \n
+    `MOTUS_CACHE_DIR` takes precedence over `XDG_CACHE_HOME/motus`, which
+    defaults to `~/.cache/motus`."""
+    if os.environ.get('MOTUS_CACHE_DIR'):
+        return os.environ['MOTUS_CACHE_DIR']
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(root, 'motus')
+
+
+def words_digest(words):
+    """Identifies an ordered list of words"""
+    digest = hashlib.sha256()
+    for word in words:
+        digest.update(word.encode() + b'\n')
+    return digest.hexdigest()
+
+
+class DicCache:
+    """Size-bounded directory of files identified by a key. \n
+    Entries are written to a temporary file then renamed, so a reader never
+    sees a partial entry. When the directory grows over `max_size` bytes,
+    the least recently used entries are deleted.
+    """
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE,
+                 content_hash=False):
+        self.directory = directory or cache_dir()
+        self.max_size = max_size
+        self.content_hash = content_hash
+
+    @staticmethod
+    def key(*parts):
+        """Returns a file name friendly digest of the parts"""
+        return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    def source_key(self, path, *parts):
+        """Returns the key of an entry derived from a source file, or `None`
+        if the file cannot be read. The file is identified by its path, size
+        and modification time, or by a hash of its content when the cache is
+        configured with `content_hash`."""
+        try:
+            stat = os.stat(path)
+            if self.content_hash:
+                digest = hashlib.sha256()
+                with open(path, 'rb') as file:
+                    for block in iter(lambda: file.read(1 << 20), b''):
+                        digest.update(block)
+                source = (digest.hexdigest(),)
+            else:
+                source = (os.path.abspath(path), stat.st_size,
+                          stat.st_mtime_ns)
+        except OSError:
+            return None
+        return self.key(*source, *parts)
+
+    def path(self, key, suffix=''):
+        return os.path.join(self.directory, key + suffix)
+
+    def get(self, key, suffix=''):
+        """Returns the path of an entry, `None` on cache miss"""
+        path = self.path(key, suffix)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, write, suffix=''):
+        """Stores an entry, `write` is called with the path to write it to.
+        Returns the path of the entry, `None` if it could not be stored."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, tmp_path = tempfile.mkstemp(dir=self.directory,
+                                                suffix='.tmp')
+            os.close(handle)
+        except OSError:
+            return None
+
+        path = self.path(key, suffix)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            return None
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.evict(keep=path)
+        return path
+
+    def invalidate(self, key, suffix=''):
+        try:
+            os.remove(self.path(key, suffix))
+        except OSError:
+            pass
+
+    def entries(self):
+        """Returns (last use, size, path) tuples, least recently used first"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if not name.endswith('.tmp'):
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """Deletes the least recently used entries until the cache fits in
+        `max_size`. The entry at `keep` is never deleted."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,253 @@
+from array import array
+import struct
+import sys
+
+
+class DawgException(Exception):
+    """Exception raised when a serialized DAWG cannot be loaded"""
+
+
+class _Node:
+    __slots__ = ('final', 'edges', 'id')
+
+    def __init__(self):
+        self.final = False
+        self.edges = dict()
+        self.id = None
+
+    def signature(self):
+        return (self.final,
+                tuple((letter, child.id)
+                      for letter, child in sorted(self.edges.items())))
+
+
+class Dawg:
+    """Directed acyclic word graph: a trie whose identical suffixes are
+    shared. \n
+    Once built, the graph is stored in flat arrays: the edges leaving node
+    `n` are `letters[first[n]:first[n + 1]]`, sorted, and lead to the nodes
+    `targets[first[n]:first[n + 1]]`. `masks[n]` has bit `k` set when a word
+    ends `k` letters below node `n`. Node 0 is the root.
+    """
+    MAGIC = b'MOTUSDWG'
+    VERSION = 1
+    HEADER = struct.Struct('<8sHxxIII')
+
+    def __init__(self, first, targets, masks, letters, finals, size):
+        self.first = first
+        self.targets = targets
+        self.masks = masks
+        self.letters = letters
+        self.finals = finals
+        self.size = size
+
+    @classmethod
+    def build(cls, words):
+        """Builds the minimal graph of sorted words in a single pass,
+        merging suffixes as soon as a branch cannot change anymore."""
+        root = _Node()
+        register = dict()
+        unchecked = []
+        previous = ''
+        size = 0
+
+        def minimize(down_to):
+            while len(unchecked) > down_to:
+                parent, letter, child = unchecked.pop()
+                key = child.signature()
+                if key in register:
+                    parent.edges[letter] = register[key]
+                else:
+                    child.id = len(register) + 1
+                    register[key] = child
+
+        for word in words:
+            if word == previous:
+                continue
+            if word < previous:
+                raise ValueError(f'Words must be sorted: {word} after '
+                                 f'{previous}')
+            common = 0
+            for a, b in zip(word, previous):
+                if a != b:
+                    break
+                common += 1
+
+            minimize(common)
+            node = unchecked[-1][2] if unchecked else root
+            for letter in word[common:]:
+                child = _Node()
+                node.edges[letter] = child
+                unchecked.append((node, letter, child))
+                node = child
+            node.final = True
+            previous = word
+            size += 1
+
+        minimize(0)
+        return cls._flatten(root, size)
+
+    @classmethod
+    def _flatten(cls, root, size):
+        order = []
+        ids = {id(root): 0}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            for letter in sorted(node.edges, reverse=True):
+                child = node.edges[letter]
+                if id(child) not in ids:
+                    ids[id(child)] = len(ids)
+                    stack.append(child)
+        order.sort(key=lambda node: ids[id(node)])
+
+        first = array('I', [0])
+        targets = array('I')
+        letters = bytearray()
+        finals = bytearray(len(order))
+        for n, node in enumerate(order):
+            for letter in sorted(node.edges):
+                letters += letter.encode('ascii')
+                targets.append(ids[id(node.edges[letter])])
+            first.append(len(targets))
+            finals[n] = node.final
+
+        masks = array('Q', [0] * len(order))
+        for n in reversed(cls._topological(first, targets, len(order))):
+            mask = finals[n]
+            for edge in range(first[n], first[n + 1]):
+                mask |= masks[targets[edge]] << 1
+            masks[n] = mask
+
+        return cls(first, targets, masks, bytes(letters), bytes(finals), size)
+
+    @staticmethod
+    def _topological(first, targets, n_nodes):
+        """Returns the node ids, parents before children"""
+        incoming = [0] * n_nodes
+        for target in targets:
+            incoming[target] += 1
+        ready = [0]
+        order = []
+        while ready:
+            n = ready.pop()
+            order.append(n)
+            for edge in range(first[n], first[n + 1]):
+                target = targets[edge]
+                incoming[target] -= 1
+                if incoming[target] == 0:
+                    ready.append(target)
+        return order
+
+    def _child(self, node, letter):
+        code = ord(letter)
+        if code > 127:
+            return None
+        edge = self.letters.find(code, self.first[node], self.first[node + 1])
+        return None if edge == -1 else self.targets[edge]
+
+    def _walk(self, prefix):
+        node = 0
+        for letter in prefix:
+            node = self._child(node, letter)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, word):
+        node = self._walk(word)
+        return node is not None and bool(self.finals[node])
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return self.iter_prefix('')
+
+    def iter_prefix(self, prefix, length=None):
+        """Yields, in alphabetical order, the words starting with `prefix`,
+        optionally restricted to words of a given length."""
+        node = self._walk(prefix)
+        if node is None:
+            return
+        if length is None:
+            wanted = -1
+        elif length < len(prefix):
+            return
+        else:
+            wanted = 1 << (length - len(prefix))
+
+        first, targets, letters = self.first, self.targets, self.letters
+        stack = [(node, prefix, wanted)]
+        while stack:
+            node, word, wanted = stack.pop()
+            if not self.masks[node] & wanted:
+                continue
+            if self.finals[node] and wanted & 1:
+                yield word
+            for edge in range(first[node + 1] - 1, first[node] - 1, -1):
+                stack.append((targets[edge], word + chr(letters[edge]),
+                              wanted >> 1 if wanted > 0 else wanted))
+
+    def lengths(self, prefix=''):
+        """Returns the sorted lengths of the words starting with `prefix`"""
+        node = self._walk(prefix)
+        if node is None:
+            return []
+        mask = self.masks[node]
+        return [len(prefix) + k for k in range(mask.bit_length())
+                if mask >> k & 1]
+
+    def children(self, prefix=''):
+        """Returns the letters that can follow `prefix`"""
+        node = self._walk(prefix)
+        if node is None:
+            return ''
+        return self.letters[self.first[node]:self.first[node + 1]].decode()
+
+    def footprint(self):
+        return sum(sys.getsizeof(part) for part in (
+            self.first, self.targets, self.masks, self.letters, self.finals))
+
+    def to_bytes(self):
+        n_nodes = len(self.finals)
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, n_nodes,
+                                  len(self.targets), self.size)
+        parts = [header]
+        for part in (self.masks, self.first, self.targets):
+            part = array(part.typecode, part)
+            if sys.byteorder == 'big':
+                part.byteswap()
+            parts.append(part.tobytes())
+        parts.extend([self.letters, self.finals])
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            magic, version, n_nodes, n_edges, size = cls.HEADER.unpack_from(
+                data)
+        except struct.error as e:
+            raise DawgException('Truncated DAWG header') from e
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise DawgException('Not a motus DAWG')
+
+        position = cls.HEADER.size
+        parts = []
+        for typecode, count in (('Q', n_nodes), ('I', n_nodes + 1),
+                                ('I', n_edges)):
+            part = array(typecode)
+            stop = position + count * part.itemsize
+            part.frombytes(data[position:stop])
+            if sys.byteorder == 'big':
+                part.byteswap()
+            parts.append(part)
+            position = stop
+        letters = bytes(data[position:position + n_edges])
+        finals = bytes(data[position + n_edges:position + n_edges + n_nodes])
+        if len(finals) != n_nodes:
+            raise DawgException('Truncated DAWG')
+
+        masks, first, targets = parts
+        return cls(first, targets, masks, letters, finals, size)
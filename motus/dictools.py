@@ -1,10 +1,36 @@
 from abc import ABC, abstractmethod
+import argparse
+from array import array
+import bz2
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 import gc
+import gzip
+import heapq
+import locale
+from itertools import chain, islice
+import lzma
 import mimetypes
+import mmap
+import os
 import pkgutil
+import re
+import stat
+import string
+import struct
+import sys
+import tempfile
+import time
 
 import yaml
 
+import motus
+import motus.dic
+from motus.cache import DicCache
+from motus.dawg import Dawg, DawgException
+
 
 class FileHandlingException(Exception):
     """Exception raised during opening a dic file for Read/Write operations"""
@@ -42,7 +68,20 @@ class Dic:
     def __init__(self):
         self.content = dict()
         self._state_flag = True
-        self._words_flag = True
+
+    @property
+    def content(self):
+        return self._content
+
+    @content.setter
+    def content(self, content):
+        self._content = content
+        self._state_flag = True
+        self._reset_indexes()
+
+    def _reset_indexes(self):
+        self._index = None
+        self._positional = dict()
 
     @property
     def state(self):
@@ -51,7 +90,7 @@ class Dic:
                 self._state = 'empty'
             elif isinstance(self.content, list):
                 self._state = 'list of words'
-            elif isinstance(list(self.content)[0], str):
+            elif isinstance(next(iter(self.content)), str):
                 self._state = 'various-initials dict'
             elif isinstance(self.content, dict):
                 self._state = 'various-lengths dict'
@@ -63,27 +102,8 @@ class Dic:
 
     @property
     def words(self):
-        if self._words_flag or self._words is None:
-            content = self.content
-            if self.state == 'various-lengths dict':
-                self._words = [
-                    word for length in list(content)
-                    for initial in list(content[length])
-                    for word in content[length][initial]
-                ]
-            elif self.state == 'various-initials dict':
-                self._words = [
-                    word for initial in list(content)
-                    for word in content[initial]
-                ]
-            elif self.state == 'list of words':
-                self._words = content
-            elif self.state == 'empty':
-                self._words = []
-
-            self._words_flag = False
-
-        return self._words
+        """Live view of all the words, following later insertions"""
+        return _WordsView(self)
 
     def _insert(self, word, container, state):
         self._state_flag = True
@@ -131,11 +151,760 @@ class Dic:
         if word is None:
             return
         try:
-            self.content = self._insert(word, self.content, self.state)
+            content = self._insert(word, self.content, self.state)
         except KeyError:
             err_str = ('Problem when adding an entry to the dic. '
                        'Internal state corrupted')
             raise DicStateException(err_str)
+        index, positional = self._index, self._positional
+        self.content = content
+        if index is not None:
+            index.add(word)
+        positional.pop(len(word), None)
+        self._index, self._positional = index, positional
+
+    def __contains__(self, word):
+        return word in self._membership()
+
+    def contains_many(self, words):
+        """Returns a list of booleans, `True` for each word of the dic"""
+        index = self._membership()
+        return [word in index for word in words]
+
+    def _membership(self):
+        """Returns the set of all the words, built on first use"""
+        if self._index is None:
+            self._index = set(self.words)
+        return self._index
+
+    def query(self, length, fixed=None, forbidden=None, min_counts=None,
+              max_counts=None, excluded=None):
+        """Returns the words of a given length matching all the criteria:\n
+        `fixed`: dict, {position: letter}, positions start at 0\n
+        `forbidden`: iterable of letters absent from the words\n
+        `min_counts`: dict, {letter: minimum number of occurrences}\n
+        `max_counts`: dict, {letter: maximum number of occurrences}\n
+        `excluded`: dict, {position: letters absent at this position}
+        """
+        index = self._positional.get(length)
+        if index is None:
+            index = self._positional[length] = PositionalIndex(
+                self._words_of_length(length))
+        return index.query(fixed, forbidden, min_counts, max_counts,
+                           excluded)
+
+    def iter_prefix(self, prefix, length=None):
+        """Yields the words starting with `prefix`, optionally restricted to
+        words of a given length"""
+        words = self.words if length is None else self._words_of_length(length)
+        return (word for word in words if word.startswith(prefix))
+
+    def _words_of_length(self, length):
+        if self.state == 'various-lengths dict':
+            by_initial = self.content.get(length, {})
+            return [word for initial in by_initial
+                    for word in by_initial[initial]]
+        return [word for word in self.words if len(word) == length]
+
+    @classmethod
+    def from_iterable(cls, words):
+        d = cls()
+        d.extend(words)
+        return d
+
+    def extend(self, words):
+        """Inserts many words in a single pass. \n
+        Words are grouped by length and initial, `None` entries and words
+        already in the dic are skipped."""
+        groups = self._groups()
+        seen = self._membership()
+        for word in words:
+            if not word or word in seen:
+                continue
+            seen.add(word)
+            by_initial = groups.get(len(word))
+            if by_initial is None:
+                by_initial = groups[len(word)] = dict()
+            bucket = by_initial.get(word[0])
+            if bucket is None:
+                bucket = by_initial[word[0]] = []
+            bucket.append(word)
+
+        self.content = self._shape(groups)
+        self._index = seen
+
+    def _groups(self):
+        """Returns the content as a various-lengths dict, sharing its lists"""
+        content = self.content
+        state = self.state
+        if state == 'various-lengths dict':
+            return content
+        elif state == 'various-initials dict':
+            one_word = next(iter(content.values()))[0]
+            return {len(one_word): content}
+        elif state == 'list of words':
+            return {len(content[0]): {content[0][0]: content}}
+        return dict()
+
+    @staticmethod
+    def _shape(groups):
+        """Returns the smallest content layout holding the groups, the one
+        `insert` would have reached"""
+        if len(groups) != 1:
+            return groups
+        by_initial = next(iter(groups.values()))
+        if len(by_initial) != 1:
+            return by_initial
+        return next(iter(by_initial.values()))
+
+    def sort(self):
+        """Sorts the words by length, initial then alphabetically, keeping
+        the content layout. The word lists of the content are sorted in
+        place, not copied."""
+        def ordered(words):
+            if isinstance(words, list):
+                words.sort()
+                return words
+            return sorted(words)
+
+        groups = self._groups()
+        self.content = self._shape({
+            length: {initial: ordered(groups[length][initial])
+                     for initial in sorted(groups[length])}
+            for length in sorted(groups)})
+
+    def footprint(self):
+        """Returns the approximate memory used by the content, in bytes"""
+        return _deep_sizeof(self.content)
+
+
+class PositionalIndex:
+    """Index of a list of words sharing the same length. \n
+    For each (position, letter) and for each (letter, number of occurrences)
+    it stores the set of matching word ids as a bitset, a Python int whose
+    bit `i` is set when `words[i]` matches. Queries are answered by
+    intersecting bitsets instead of scanning the words."""
+    def __init__(self, words):
+        self.words = list(words)
+        self.length = len(self.words[0]) if self.words else 0
+        self.all = (1 << len(self.words)) - 1
+
+        positions = [dict() for _ in range(self.length)]
+        counts = dict()
+        for i, word in enumerate(self.words):
+            for position, letter in enumerate(word):
+                positions[position].setdefault(letter, []).append(i)
+            for letter in set(word):
+                by_count = counts.setdefault(letter, [])
+                for count in range(word.count(letter)):
+                    if count == len(by_count):
+                        by_count.append([])
+                    by_count[count].append(i)
+
+        self.positions = [{letter: self._bitset(ids)
+                           for letter, ids in by_letter.items()}
+                          for by_letter in positions]
+        # counts[letter][n] is the bitset of the words using `letter` more
+        # than n times
+        self.counts = {letter: [self._bitset(ids) for ids in by_count]
+                       for letter, by_count in counts.items()}
+
+    def _bitset(self, ids):
+        bits = bytearray(b'0') * len(self.words)
+        for i in ids:
+            bits[i] = ord('1')
+        bits.reverse()
+        return int(bits, 2)
+
+    def at_least(self, letter, count):
+        """Returns the bitset of the words using `letter` `count` times or
+        more"""
+        if count <= 0:
+            return self.all
+        by_count = self.counts.get(letter, [])
+        return by_count[count - 1] if count <= len(by_count) else 0
+
+    def query(self, fixed=None, forbidden=None, min_counts=None,
+              max_counts=None, excluded=None):
+        bits = self.all
+        for position, letter in (fixed or {}).items():
+            if not 0 <= position < self.length:
+                return []
+            bits &= self.positions[position].get(letter, 0)
+        for position, letters in (excluded or {}).items():
+            if 0 <= position < self.length:
+                for letter in letters:
+                    bits &= ~self.positions[position].get(letter, 0)
+        for letter in forbidden or ():
+            bits &= ~self.at_least(letter, 1)
+        for letter, count in (min_counts or {}).items():
+            bits &= self.at_least(letter, count)
+        for letter, count in (max_counts or {}).items():
+            bits &= ~self.at_least(letter, count + 1)
+
+        return self.select(bits)
+
+    def select(self, bits):
+        """Returns the words whose bit is set"""
+        words = self.words
+        digits = bin(bits & self.all)[:1:-1]
+        selected = []
+        i = digits.find('1')
+        while i != -1:
+            selected.append(words[i])
+            i = digits.find('1', i + 1)
+        return selected
+
+
+def _deep_sizeof(obj):
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(key) + _deep_sizeof(value)
+                    for key, value in obj.items())
+    elif isinstance(obj, list):
+        size += sum(_deep_sizeof(item) for item in obj)
+    return size
+
+
+def _as_builtin(content):
+    """Converts content views back to plain dicts and lists"""
+    if isinstance(content, (dict, Mapping)):
+        return {key: _as_builtin(value) for key, value in content.items()}
+    elif isinstance(content, (str, bytes)):
+        return content
+    elif isinstance(content, (list, Sequence)):
+        return list(content)
+    return content
+
+
+def _content_words(content):
+    """Yields the words of any content layout"""
+    if isinstance(content, Mapping):
+        for value in content.values():
+            yield from _content_words(value)
+    elif content:
+        yield from content
+
+
+INITIALS = string.ascii_uppercase
+
+# Binary dic layout: a header, then one entry per length giving the number
+# of words, the position of the word block in the file and the offsets of
+# each initial inside the block, then the blocks themselves.
+MDIC_MAGIC = b'MOTUSDIC'
+MDIC_VERSION = 1
+MDIC_HEADER = struct.Struct('<8sHxxI')
+MDIC_ENTRY = struct.Struct(f'<IIQ{len(INITIALS) + 1}I')
+
+
+class CompactDic(Dic):
+    """Dic storing its words in one fixed-width byte buffer per length. \n
+    Inside a buffer, words are grouped by initial and an offset table gives
+    the bounds of each group, so that a word costs `length` bytes instead of
+    a full Python `str`. `content` and `words` are read-only views shaped
+    like the ones of a regular Dic.
+    """
+    def __init__(self):
+        self._buffers = dict()
+        self._offsets = dict()
+        super().__init__()
+
+    @classmethod
+    def from_dic(cls, dic):
+        d = cls()
+        d.content = dic.content
+        return d
+
+    @property
+    def content(self):
+        return _ContentView(self)
+
+    @content.setter
+    def content(self, content):
+        self._buffers = dict()
+        self._offsets = dict()
+        self._state_flag = True
+        self._reset_indexes()
+        self._load(_content_words(content))
+
+    @property
+    def state(self):
+        if self._buffers:
+            return 'various-lengths dict'
+        return 'empty'
+
+    def insert(self, word):
+        if word is None:
+            return
+        length = len(word)
+        # Rejected words raise before the buffers are touched
+        index = self._initial_index(word)
+        encoded = self._encode(word)
+        buffer = self._buffers.get(length)
+        if buffer is None:
+            buffer = self._buffers[length] = bytearray()
+            self._offsets[length] = array('L', [0] * (len(INITIALS) + 1))
+        else:
+            buffer = self._writable(length)
+
+        offsets = self._offsets[length]
+        end = offsets[index + 1] * length
+        try:
+            buffer[end:end] = encoded
+        except BufferError:
+            # The buffer is exported by a memoryview and cannot be resized
+            buffer = self._buffers[length] = bytearray(buffer)
+            buffer[end:end] = encoded
+        if self._index is not None:
+            self._index.add(word)
+        self._positional.pop(length, None)
+        for i in range(index + 1, len(offsets)):
+            offsets[i] += 1
+
+    def extend(self, words):
+        seen = self._membership()
+        unseen = [word for word in dict.fromkeys(words)
+                  if word and word not in seen]
+        self._load(unseen)
+        seen.update(unseen)
+        self._positional = dict()
+
+    def _writable(self, length):
+        """Copies a mapped buffer to memory before its first modification"""
+        buffer = self._buffers[length]
+        if not isinstance(buffer, bytearray):
+            buffer = self._buffers[length] = bytearray(buffer)
+        return buffer
+
+    def _load(self, words):
+        """Appends words in bulk, rebuilding each buffer only once. All the
+        words are encoded before any buffer is replaced, so that a rejected
+        word leaves the dic unchanged."""
+        groups = dict()
+        for word in words:
+            if word is None:
+                continue
+            by_initial = groups.setdefault(len(word), dict())
+            by_initial.setdefault(self._initial_index(word), []).append(
+                self._encode(word))
+
+        buffers = dict()
+        for length, by_initial in groups.items():
+            old = self._buffers.get(length, bytearray())
+            old_offsets = self._offsets.get(length)
+            parts = []
+            offsets = array('L', [0] * (len(INITIALS) + 1))
+            for index in range(len(INITIALS)):
+                count = offsets[index]
+                if old_offsets is not None:
+                    parts.append(old[old_offsets[index] * length:
+                                     old_offsets[index + 1] * length])
+                    count += old_offsets[index + 1] - old_offsets[index]
+                new = by_initial.get(index, [])
+                parts.extend(new)
+                offsets[index + 1] = count + len(new)
+            buffers[length] = bytearray(b''.join(parts)), offsets
+
+        for length, (buffer, offsets) in buffers.items():
+            self._buffers[length] = buffer
+            self._offsets[length] = offsets
+
+    @staticmethod
+    def _initial_index(word):
+        index = ord(word[0]) - ord('A') if word else -1
+        if not 0 <= index < len(INITIALS):
+            raise DicStateException(
+                f'Cannot store {word!r}: words must start with a A-Z letter')
+        return index
+
+    @staticmethod
+    def _encode(word):
+        try:
+            return word.encode('ascii')
+        except UnicodeEncodeError as e:
+            raise DicStateException(
+                f'Cannot store {word!r}: non ASCII characters') from e
+
+    def _block(self, length, initial):
+        """Returns the (start, stop) word indices of a group"""
+        offsets = self._offsets[length]
+        index = INITIALS.index(initial)
+        return offsets[index], offsets[index + 1]
+
+    def _word(self, length, i):
+        return str(self._buffers[length][i * length:(i + 1) * length], 'ascii')
+
+    def buffer(self, length, initial=None):
+        """Returns a memoryview over the words of a given length, optionally
+        restricted to an initial, without copying them."""
+        view = memoryview(self._buffers[length])
+        if initial is None:
+            return view
+        start, stop = self._block(length, initial)
+        return view[start * length:stop * length]
+
+    def footprint(self):
+        size = sys.getsizeof(self._buffers) + sys.getsizeof(self._offsets)
+        for length, buffer in self._buffers.items():
+            size += sys.getsizeof(length) + sys.getsizeof(buffer)
+            size += sys.getsizeof(self._offsets[length])
+            if isinstance(buffer, memoryview):
+                size += buffer.nbytes
+        return size
+
+
+class _SequenceView(Sequence):
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, Sequence)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class _BlockView(_SequenceView):
+    """Words of a CompactDic sharing a length and an initial"""
+    def __init__(self, dic, length, initial):
+        self._dic = dic
+        self._length = length
+        self._initial = initial
+
+    def __len__(self):
+        start, stop = self._dic._block(self._length, self._initial)
+        return stop - start
+
+    def __getitem__(self, i):
+        start, stop = self._dic._block(self._length, self._initial)
+        if isinstance(i, slice):
+            return [self._dic._word(self._length, start + j)
+                    for j in range(*i.indices(stop - start))]
+        if i < 0:
+            i += stop - start
+        if not 0 <= i < stop - start:
+            raise IndexError('word index out of range')
+        return self._dic._word(self._length, start + i)
+
+    def __iter__(self):
+        start, stop = self._dic._block(self._length, self._initial)
+        length = self._length
+        data = bytes(self._dic._buffers[length][start * length:stop * length])
+        for i in range(0, len(data), length):
+            yield data[i:i + length].decode()
+
+
+class _LengthView(Mapping):
+    """Words of a CompactDic sharing a length, by initial"""
+    def __init__(self, dic, length):
+        self._dic = dic
+        self._length = length
+
+    def __getitem__(self, initial):
+        if initial not in self._initials():
+            raise KeyError(initial)
+        return _BlockView(self._dic, self._length, initial)
+
+    def _initials(self):
+        offsets = self._dic._offsets[self._length]
+        return [initial for i, initial in enumerate(INITIALS)
+                if offsets[i + 1] > offsets[i]]
+
+    def __iter__(self):
+        return iter(self._initials())
+
+    def __len__(self):
+        return len(self._initials())
+
+    def __repr__(self):
+        return repr(_as_builtin(self))
+
+
+class _ContentView(Mapping):
+    """`content` of a CompactDic, by length then by initial"""
+    def __init__(self, dic):
+        self._dic = dic
+
+    def __getitem__(self, length):
+        if length not in self._dic._buffers:
+            raise KeyError(length)
+        return _LengthView(self._dic, length)
+
+    def __iter__(self):
+        return iter(self._dic._buffers)
+
+    def __len__(self):
+        return len(self._dic._buffers)
+
+    def __repr__(self):
+        return repr(_as_builtin(self))
+
+
+class _WordsView(_SequenceView):
+    """Flat view of the words of a Dic. \n
+    The view reads the content of the Dic on each access, words are never
+    copied to an intermediate list."""
+    def __init__(self, dic):
+        self._dic = dic
+
+    def _buckets(self):
+        content = self._dic.content
+        state = self._dic.state
+        if state == 'various-lengths dict':
+            for length in content:
+                for initial in content[length]:
+                    yield content[length][initial]
+        elif state == 'various-initials dict':
+            for initial in content:
+                yield content[initial]
+        elif state == 'list of words':
+            yield content
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step > 0:
+                return list(islice(self, start, stop, step))
+            return [self[j] for j in range(start, stop, step)]
+        if i < 0:
+            i += len(self)
+        if i >= 0:
+            for bucket in self._buckets():
+                if i < len(bucket):
+                    return bucket[i]
+                i -= len(bucket)
+        raise IndexError('word index out of range')
+
+    def __iter__(self):
+        for bucket in self._buckets():
+            yield from bucket
+
+
+class DawgDic(Dic):
+    """Dic backed by a directed acyclic word graph, sharing both the
+    prefixes and the suffixes of its words. \n
+    The graph is static: inserted words are buffered and the graph is rebuilt
+    on the next read, so `extend` should be preferred to add many words.
+    """
+    def __init__(self):
+        self._dawg = Dawg.build([])
+        self._pending = []
+        super().__init__()
+
+    @classmethod
+    def from_dawg(cls, dawg):
+        d = cls()
+        d._dawg = dawg
+        return d
+
+    @property
+    def dawg(self):
+        if self._pending:
+            pending = sorted(set(self._pending))
+            self._dawg = Dawg.build(heapq.merge(self._dawg, pending))
+            self._pending = []
+        return self._dawg
+
+    @property
+    def content(self):
+        return _DawgContentView(self)
+
+    @content.setter
+    def content(self, content):
+        self._dawg = Dawg.build([])
+        self._pending = list(_content_words(content))
+        self._state_flag = True
+        self._reset_indexes()
+
+    @property
+    def state(self):
+        return 'various-lengths dict' if len(self.dawg) else 'empty'
+
+    @property
+    def words(self):
+        return _DawgWordsView(self)
+
+    def insert(self, word):
+        if word is None:
+            return
+        self._pending.append(word)
+        self._positional.pop(len(word), None)
+
+    def extend(self, words):
+        self._pending.extend(word for word in words if word)
+        self._positional = dict()
+
+    def __contains__(self, word):
+        return word in self.dawg
+
+    def contains_many(self, words):
+        dawg = self.dawg
+        return [word in dawg for word in words]
+
+    def iter_prefix(self, prefix, length=None):
+        return self.dawg.iter_prefix(prefix, length)
+
+    def footprint(self):
+        return self.dawg.footprint()
+
+
+class _DawgLengthView(Mapping):
+    """Words of a DawgDic sharing a length, by initial. \n
+    Groups are listed from the graph on each access."""
+    def __init__(self, dawg, length):
+        self._dawg = dawg
+        self._length = length
+
+    def __getitem__(self, initial):
+        words = []
+        if len(initial) == 1:
+            words = list(self._dawg.iter_prefix(initial, self._length))
+        if not words:
+            raise KeyError(initial)
+        return words
+
+    def __iter__(self):
+        return (initial for initial in self._dawg.children()
+                if self._length in self._dawg.lengths(initial))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(_as_builtin(self))
+
+
+class _DawgContentView(Mapping):
+    """`content` of a DawgDic, by length then by initial"""
+    def __init__(self, dic):
+        self._dawg = dic.dawg
+
+    def __getitem__(self, length):
+        if length not in self._dawg.lengths():
+            raise KeyError(length)
+        return _DawgLengthView(self._dawg, length)
+
+    def __iter__(self):
+        return iter(self._dawg.lengths())
+
+    def __len__(self):
+        return len(self._dawg.lengths())
+
+    def __repr__(self):
+        return repr(_as_builtin(self))
+
+
+class _DawgWordsView(_WordsView):
+    def __len__(self):
+        return len(self._dic.dawg)
+
+
+class ShardedDic(Dic):
+    """Dic split in one CompactDic per length, each shard being loaded on
+    first access. \n
+    `content[length]`, `query(length)` or a membership test only load the
+    shard of the length they need, so memory and loading time follow the
+    lengths actually used.
+    """
+    def __init__(self):
+        self._shards = dict()
+        self._loaders = dict()
+        super().__init__()
+
+    @classmethod
+    def from_loaders(cls, loaders):
+        """`loaders`: dict, {length: callable returning the CompactDic of the
+        words of that length}"""
+        d = cls()
+        d._loaders = dict(loaders)
+        return d
+
+    def shard(self, length):
+        """Returns the CompactDic of a length, `None` if there is none"""
+        shard = self._shards.get(length)
+        if shard is None and length in self._loaders:
+            shard = self._shards[length] = self._loaders.pop(length)()
+        return shard
+
+    @property
+    def loaded(self):
+        """Sorted lengths whose shard is in memory"""
+        return sorted(self._shards)
+
+    def _lengths(self):
+        return sorted(set(self._shards) | set(self._loaders))
+
+    @property
+    def content(self):
+        return _ShardedContentView(self)
+
+    @content.setter
+    def content(self, content):
+        self._shards = dict()
+        self._loaders = dict()
+        self._state_flag = True
+        self._reset_indexes()
+        self.extend(_content_words(content))
+
+    @property
+    def state(self):
+        return 'various-lengths dict' if self._lengths() else 'empty'
+
+    def insert(self, word):
+        if word is None:
+            return
+        shard = self.shard(len(word))
+        if shard is None:
+            shard = self._shards[len(word)] = CompactDic()
+        shard.insert(word)
+        self._positional.pop(len(word), None)
+
+    def extend(self, words):
+        groups = dict()
+        for word in words:
+            if word:
+                groups.setdefault(len(word), []).append(word)
+
+        for length, group in groups.items():
+            shard = self.shard(length)
+            if shard is None:
+                shard = self._shards[length] = CompactDic()
+            shard.extend(group)
+            self._positional.pop(length, None)
+
+    def __contains__(self, word):
+        shard = self.shard(len(word))
+        return shard is not None and word in shard
+
+    def contains_many(self, words):
+        return [word in self for word in words]
+
+    def footprint(self):
+        return (sys.getsizeof(self._shards) + sys.getsizeof(self._loaders)
+                + sum(shard.footprint() for shard in self._shards.values()))
+
+
+class _ShardedContentView(Mapping):
+    """`content` of a ShardedDic, listing lengths without loading them"""
+    def __init__(self, dic):
+        self._dic = dic
+
+    def __getitem__(self, length):
+        shard = self._dic.shard(length)
+        if shard is None:
+            raise KeyError(length)
+        return shard.content[length]
+
+    def __iter__(self):
+        return iter(self._dic._lengths())
+
+    def __len__(self):
+        return len(self._dic._lengths())
+
+    def __repr__(self):
+        return repr(_as_builtin(self))
 
 
 class FileHandler(ABC):
@@ -144,6 +913,12 @@ class FileHandler(ABC):
     if mimetypes.guess_type('example.yml')[0] is None:
         mimetypes.add_type('application/x-yaml', '.yml')
         mimetypes.add_type('application/x-yaml', '.yaml')
+    if mimetypes.guess_type('example.mdic')[0] is None:
+        mimetypes.add_type('application/x-motus-dic', '.mdic')
+    if mimetypes.guess_type('example.dawg')[0] is None:
+        mimetypes.add_type('application/x-motus-dawg', '.dawg')
+    if mimetypes.guess_type('example.mdics')[0] is None:
+        mimetypes.add_type('application/x-motus-shards', '.mdics')
 
     @abstractmethod
     def __init__(self):
@@ -167,30 +942,209 @@ class FileHandler(ABC):
 
         return self._inferred_filetype
 
+    @property
+    def inferred_compression(self):
+        """Compression of the dic file, `None` for a plain file"""
+        if self.dic_path is None:
+            return None
+        return self._compression_of(self.dic_path)
+
+    @staticmethod
+    def _compression_of(path):
+        """Returns the compression given by the extension of a file"""
+        encoding = mimetypes.guess_type(path)[1]
+        if encoding is not None and encoding not in COMPRESSIONS:
+            raise FileHandlingException(f'Unsupported compression: {encoding}')
+        return encoding
+
+
+VALID_WORD = re.compile('[A-Z]+')
+SHARD_NAME = re.compile(r'([0-9]+)\.mdic')
+# Filetypes worth caching in the binary layout, the binary formats are
+# already faster to load and keep their own Dic backend
+CACHED_FILETYPES = ('text/plain', 'application/x-yaml')
+YAML_DUMPER = getattr(yaml, 'CDumper', yaml.Dumper)
+YAML_RESOLVER = yaml.resolver.Resolver()
+YAML_STR = 'tag:yaml.org,2002:str'
+YAML_INT = 'tag:yaml.org,2002:int'
+# Modules handling the compressions known by mimetypes, and the magic number
+# starting their files
+COMPRESSIONS = {
+    'gzip': (gzip, b'\x1f\x8b'),
+    'bzip2': (bz2, b'BZh'),
+    'xz': (lzma, b'\xfd7zXZ\x00'),
+}
+
+
+def _sniff_compression(head):
+    """Returns the compression of data starting with `head`"""
+    for compression, (_, magic) in COMPRESSIONS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _open(path, mode='r', compression=None, **kwargs):
+    """Opens a file, compressed files are (de)compressed on the fly"""
+    if compression is None:
+        return open(path, mode, **kwargs)
+    kwargs.pop('buffering', None)
+    if 'b' not in mode:
+        mode += 't'
+    return COMPRESSIONS[compression][0].open(path, mode, **kwargs)
+
+
+def _read_umask():
+    """Returns the umask of the process, from `/proc` when available since
+    `os.umask` can only read it by changing it for every thread. \n
+    Without `/proc` it falls back to setting then restoring the umask: this
+    runs once, at import, but a thread creating files at that very moment
+    would still get the temporary 022 umask."""
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import, new files get the permissions `open` would give them
+UMASK = _read_umask()
+
+
+def _new_file_mode(path):
+    """Returns the permissions of the file at `path`, the default ones of a
+    new file if there is none. \n
+    The default ones follow the umask read at import, a later `os.umask`
+    call is ignored."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~UMASK
+
+
+@contextmanager
+def _atomic_open(path, mode='w', compression=None, **kwargs):
+    """Opens a temporary file next to `path`, renamed to `path` once the
+    file is closed. On error, the temporary file is removed and `path` is
+    left untouched. The file keeps the permissions of the file it replaces.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    handle, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{name}.',
+                                        suffix='.tmp')
+    os.close(handle)
+    try:
+        # mkstemp files are private
+        os.chmod(tmp_path, _new_file_mode(path))
+        with _open(tmp_path, mode, compression, **kwargs) as file:
+            yield file
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _yaml_events(content):
+    """Yields the YAML events of a content, without copying it, in the
+    order of `yaml.dump`: mapping keys sorted, block style"""
+    if isinstance(content, str):
+        implicit = YAML_RESOLVER.resolve(
+            yaml.ScalarNode, content, (True, False)) == YAML_STR
+        yield yaml.ScalarEvent(None, None, (implicit, True), content)
+    elif isinstance(content, int):
+        yield yaml.ScalarEvent(None, YAML_INT, (True, False), str(content))
+    elif isinstance(content, Mapping):
+        yield yaml.MappingStartEvent(None, None, True, flow_style=False)
+        for key in sorted(content):
+            yield from _yaml_events(key)
+            yield from _yaml_events(content[key])
+        yield yaml.MappingEndEvent()
+    else:
+        yield yaml.SequenceStartEvent(None, None, True, flow_style=False)
+        for word in content:
+            yield from _yaml_events(word)
+        yield yaml.SequenceEndEvent()
+
+
+def _decompress(data):
+    """Returns the decompressed data, unchanged if it is not compressed"""
+    compression = _sniff_compression(data[:8])
+    if compression is None:
+        return data
+    return COMPRESSIONS[compression][0].decompress(data)
+
+
+class SubstitutionEngine:
+    """Substitution rules compiled to be applied in a single pass. \n
+    When every rule replaces a single character, the rules become a
+    `str.translate` table. Otherwise they are merged into one alternation
+    regex, longest rules first. Rules are applied simultaneously, the output
+    of a rule is never substituted again."""
+    def __init__(self, rules):
+        self.rules = rules
+        self._table = None
+        self._pattern = None
+        if all(len(old) == 1 for old in rules):
+            self._table = str.maketrans(dict(rules))
+        else:
+            alternatives = sorted(rules, key=len, reverse=True)
+            self._pattern = re.compile('|'.join(map(re.escape, alternatives)))
+            self._replace = dict(rules).__getitem__
+
+    def __call__(self, word):
+        if self._table is not None:
+            return word.translate(self._table)
+        return self._pattern.sub(lambda match: self._replace(match.group()),
+                                 word)
+
 
 class Reader(FileHandler):
+    CHUNK_SIZE = 1 << 20
+    # Method parsing each filetype
+    PARSERS = {'text/plain': '_txt_parser',
+               'application/x-yaml': '_yaml_parser',
+               'application/x-motus-dic': '_mdic_parser',
+               'application/x-motus-dawg': '_dawg_parser',
+               'application/x-motus-shards': '_shards_parser'}
+
     def __init__(self, *args, **kwargs):
         super().__init__()
         self.pckg = None
+        self.cache = None
         self._substitutions = {}
+        self._engine = None
         self.config(*args, **kwargs)
 
-    def config(self, dic_path=None, filetype=None, config=None, pckg=None):
-        """Takes up to 4 positional keyword arguments :\n
+    def config(self, dic_path=None, filetype=None, config=None, pckg=None,
+               cache=None):
+        """Takes up to 5 positional keyword arguments :\n
         `dic_path`: str, path to the dictionary\n
-        `filetype`: str, accepts `text/plain` and `application/x-yaml`\n
+        `filetype`: str, accepts `text/plain`, `application/x-yaml`,
+        `application/x-motus-dic`, `application/x-motus-dawg` and
+        `application/x-motus-shards`, possibly gzip, bzip2 or xz
+        compressed\n
         `config`: str, path to a config file\n
-        `pckg`: bool, `True` if the dic should be retrieved from the package
+        `pckg`: bool, `True` if the dic should be retrieved from the package\n
+        `cache`: bool or DicCache, keeps parsed dics in a cache directory
         """
         if pckg is not None:
             self.pckg = pckg
+        if cache is not None:
+            self.cache = DicCache() if cache is True else cache or None
         if config is not None:
             self._config_substitutions(config)
         super().config(dic_path, filetype)
 
     def add_substitution(self, old: str, new: str):
-        print(self._substitutions)
         self._substitutions[old.upper()] = new.upper()
+        self._engine = None
 
     def _config_substitutions(self, config_file):
         self._substitutions = dict()
@@ -212,17 +1166,86 @@ class Reader(FileHandler):
                         f'{line}'
                     ) from e
 
-    def parse(self, dic_path=None, filetype=None, pckg=None):
+    def parse(self, dic_path=None, filetype=None, pckg=None, workers=None):
+        """Returns the Dic stored in the configured file. \n
+        `workers`: int, number of processes cleaning a text file in parallel,
+        other file types are always parsed by the current process."""
         if (dic_path or filetype or pckg) is not None:
             self.config(dic_path=dic_path, filetype=filetype, pckg=pckg)
 
+        filetype = self._checked_filetype()
+        key = None
+        if self.cache is not None and filetype in CACHED_FILETYPES:
+            key = self._cache_key(filetype)
+        d = self._cache_lookup(key) if key else None
+        if d is None:
+            d = self._parse_file(filetype, workers)
+            if key:
+                d = self._cache_store(key, d)
+        return d
+
+    def _cache_lookup(self, key):
+        """Returns the cached Dic of a key, `None` on cache miss"""
+        path = self.cache.get(key, '.mdic')
+        if path:
+            try:
+                return self._map_mdic(path)
+            except (OSError, ParsingException):
+                self.cache.invalidate(key, '.mdic')
+        return None
+
+    def _cache_store(self, key, d):
+        """Caches a parsed Dic, returns it mapped from the cache, or as is
+        when it cannot be stored"""
+        try:
+            path = self.cache.put(
+                key, lambda tmp: Writer._mdic_writer(d, tmp), '.mdic')
+        except DicStateException:
+            # Only A-Z words fit in the binary format
+            path = None
+        return self._map_mdic(path) if path else d
+
+    def _source_path(self):
+        if self.pckg:
+            return os.path.join(os.path.dirname(motus.dic.__file__),
+                                self.dic_path)
+        return self.dic_path
+
+    def _cache_key(self, filetype):
+        """Identifies a parse result: the source file, the substitutions
+        and the library version. Returns `None` if the source is missing."""
+        return self.cache.source_key(
+            self._source_path(), filetype, sorted(self._substitutions.items()),
+            motus.__version__, MDIC_VERSION)
+
+    def clear_cache(self):
+        if self.cache is not None:
+            self.cache.clear()
+
+    def iter_words(self, dic_path=None, filetype=None):
+        """Yields the cleaned words of a dictionary without building a Dic.
+        \n
+        Text files are read by chunks of about `CHUNK_SIZE` bytes, so memory
+        stays bounded whatever the size of the file, and the file is closed
+        as soon as the generator is exhausted or closed. Other formats are
+        parsed first."""
+        if (dic_path or filetype) is not None:
+            self.config(dic_path=dic_path, filetype=filetype)
+
+        filetype = self._checked_filetype()
+        if filetype == 'text/plain':
+            yield from self._iter_txt(self.dic_path)
+        else:
+            yield from self._get_parser(filetype).words
+
+    def _checked_filetype(self):
         if 'dic_path' not in dir(self) or self.dic_path is None:
             raise FileHandlingException('No Target file')
 
         if (('filetype' not in dir(self) or self.filetype is None)
                 and self.inferred_filetype is None):
             raise FileHandlingException(f'Could not infer a file type for'
-                                        f'{self.file_path}')
+                                        f'{self.dic_path}')
 
         if ((self.filetype and self.inferred_filetype) is not None
                 and self.filetype != self.inferred_filetype):
@@ -230,32 +1253,64 @@ class Reader(FileHandler):
                        f'{self.inferred_filetype}')
             raise FileHandlingException(err_str)
 
-        return self._get_parser(self.filetype or self.inferred_filetype)
+        return self.filetype or self.inferred_filetype
+
+    def _parse_file(self, filetype, workers=None):
+        """Parses the file, uncompressed text files in `workers` processes
+        """
+        if (workers is not None and workers > 1 and filetype == 'text/plain'
+                and self._compression_of(self.dic_path) is None):
+            return self._sharded_txt_parser(self.dic_path, workers)
+        return self._get_parser(filetype)
 
     def _get_parser(self, filetype):
-        if filetype == 'text/plain':
-            return self._txt_parser(self.dic_path)
-        elif filetype == 'application/x-yaml':
-            return self._yaml_parser(self.dic_path)
-        else:
-            raise FileHandlingException('Unknown filetype: {filetype}')
+        """Parses the file with the method of its filetype in `PARSERS`"""
+        if filetype not in self.PARSERS:
+            raise FileHandlingException(f'Unknown filetype: {filetype}')
+        return getattr(self, self.PARSERS[filetype])(self.dic_path)
 
     def _txt_parser(self, path):
         d = new_dic()
-        for line in open(path, 'r'):
-            d.insert(self.clean(line))
+        d.extend(self._iter_txt(path))
 
         return d
 
+    def _sharded_txt_parser(self, path, workers):
+        """Cleans shards of the file in separate processes. Shards are merged
+        in file order, the result is the one of `_txt_parser`."""
+        offsets = _shard_offsets(path, workers)
+        count = len(offsets) - 1
+        with ProcessPoolExecutor(max_workers=min(workers, count)) as pool:
+            shards = pool.map(_parse_shard, [path] * count, offsets[:-1],
+                              offsets[1:], [dict(self._substitutions)] * count)
+            d = new_dic()
+            d.extend(word for groups in shards
+                     for by_initial in groups.values()
+                     for bucket in by_initial.values()
+                     for word in bucket)
+
+        return d
+
+    def _iter_txt(self, path):
+        with _open(path, 'r', self._compression_of(path),
+                   buffering=self.CHUNK_SIZE) as file:
+            lines = file.readlines(self.CHUNK_SIZE)
+            while lines:
+                for line in lines:
+                    word = self.clean(line)
+                    if word is not None:
+                        yield word
+                lines = file.readlines(self.CHUNK_SIZE)
+
     def _yaml_parser(self, path):
         d = new_dic()
         if self.pckg:
-            data = pkgutil.get_data('motus.dic', self.dic_path)
+            data = _decompress(pkgutil.get_data('motus.dic', self.dic_path))
             d.content = yaml.safe_load(data.decode())
             del data
             gc.collect()
         else:
-            with open(path, 'r') as file:
+            with _open(path, 'r', self._compression_of(path)) as file:
                 d.content = yaml.safe_load(file)
 
         if d.content is None:
@@ -263,19 +1318,104 @@ class Reader(FileHandler):
 
         return d
 
+    def _mdic_parser(self, path):
+        """Maps a binary dictionary in memory. Only the header is read, word
+        blocks are paged in by the OS when first accessed. A compressed
+        binary dictionary cannot be mapped and is decompressed in memory."""
+        if self.pckg:
+            path = self._source_path()
+        compression = self._compression_of(path)
+        if compression is not None:
+            with _open(path, 'rb', compression) as file:
+                return self._load_mdic(file.read(), path)
+        return self._map_mdic(path)
+
+    @staticmethod
+    def _map_mdic(path):
+        with open(path, 'rb') as file:
+            try:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise ParsingException(f'Empty binary dic {path}') from e
+        return Reader._load_mdic(data, path)
+
+    @staticmethod
+    def _load_mdic(data, path):
+        """Returns a CompactDic whose buffers are views over `data`"""
+        try:
+            magic, version, n_lengths = MDIC_HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ParsingException(f'{path} is not a motus binary dic') from e
+        if magic != MDIC_MAGIC or version != MDIC_VERSION:
+            raise ParsingException(f'{path} is not a motus binary dic')
+
+        d = CompactDic()
+        view = memoryview(data)
+        position = MDIC_HEADER.size
+        for _ in range(n_lengths):
+            length, count, start, *offsets = MDIC_ENTRY.unpack_from(
+                data, position)
+            position += MDIC_ENTRY.size
+            d._buffers[length] = view[start:start + count * length]
+            d._offsets[length] = array('L', offsets)
+
+        return d
+
+    def _shards_parser(self, path):
+        """Lists the shards of a directory of binary dics, one per length.
+        A shard is only mapped when its length is first accessed."""
+        if self.pckg:
+            path = self._source_path()
+        try:
+            names = os.listdir(path)
+        except OSError as e:
+            raise ParsingException(f'Could not list shards of {path}') from e
+
+        loaders = dict()
+        for name in names:
+            match = SHARD_NAME.fullmatch(name)
+            if match:
+                loaders[int(match.group(1))] = partial(
+                    self._map_mdic, os.path.join(path, name))
+        return ShardedDic.from_loaders(loaders)
+
+    def _dawg_parser(self, path):
+        if self.pckg:
+            data = _decompress(pkgutil.get_data('motus.dic', self.dic_path))
+        else:
+            with _open(path, 'rb', self._compression_of(path)) as file:
+                data = file.read()
+
+        try:
+            return DawgDic.from_dawg(Dawg.from_bytes(data))
+        except DawgException as e:
+            raise ParsingException(f'Could not parse {path}: {e}') from e
+
+    @classmethod
+    def _compression_of(cls, path):
+        """Returns the compression given by the extension of a file or,
+        failing that, by its magic number"""
+        compression = super()._compression_of(path)
+        if compression is None and os.path.isfile(path):
+            with open(path, 'rb') as file:
+                compression = _sniff_compression(file.read(8))
+        return compression
+
     def clean(self, line):
-        word = line.strip().upper()
-        for old, new in self._substitutions.items():
-            word = word.replace(old, new)
+        engine = self._engine
+        if engine is None or engine.rules is not self._substitutions:
+            engine = self._engine = SubstitutionEngine(self._substitutions)
+
+        word = engine(line.strip().upper())
 
         if word == '':
             return None
 
-        if (ord(min(word)) > 64 and ord(max(word)) < 90):
+        if VALID_WORD.fullmatch(word):
             return word
 
         else:
-            unauth = [char for char in word if ord(char) < 64 or ord(char) > 90]
+            unauth = [char for char in word if char not in INITIALS]
             if len(unauth) == 1:
                 error_str = f'Unauthorized character {unauth[0]} in word {word}'
             else:
@@ -283,7 +1423,57 @@ class Reader(FileHandler):
             raise NonAplhaWordException(error_str)
 
 
+def _shard_offsets(path, count):
+    """Splits a file in up to `count` byte ranges of similar sizes, cut at
+    line boundaries. Returns the list of boundaries."""
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, 'rb') as file:
+        for i in range(1, count):
+            position = size * i // count
+            if position <= offsets[-1]:
+                continue
+            file.seek(position - 1)
+            file.readline()
+            if offsets[-1] < file.tell() < size:
+                offsets.append(file.tell())
+    offsets.append(size)
+    return offsets
+
+
+def _parse_shard(path, start, stop, substitutions):
+    """Cleans the lines of a file between two byte offsets, returns the
+    words grouped by length and initial."""
+    rd = Reader()
+    rd._substitutions = substitutions
+    encoding = locale.getpreferredencoding(False)
+    groups = dict()
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = stop - start
+        for line in file:
+            if remaining <= 0:
+                break
+            remaining -= len(line)
+            word = rd.clean(line.decode(encoding))
+            if word is not None:
+                by_initial = groups.setdefault(len(word), dict())
+                by_initial.setdefault(word[0], []).append(word)
+
+    return groups
+
+
 class Writer(FileHandler):
+    """Saves Dics. Files are written to a temporary file then renamed, so
+    a failed write never leaves a partial dictionary behind."""
+    BATCH_SIZE = 1 << 14
+    # Method writing each filetype
+    WRITERS = {'text/plain': '_txt_writer',
+               'application/x-yaml': '_yaml_writer',
+               'application/x-motus-dic': '_mdic_writer',
+               'application/x-motus-dawg': '_dawg_writer',
+               'application/x-motus-shards': '_shards_writer'}
+
     def __init__(self, *args, **kwargs):
         super().__init__()
         self.config(*args, **kwargs)
@@ -291,7 +1481,10 @@ class Writer(FileHandler):
     def config(self, dic_path=None, filetype=None):
         """ Takes up to 2 positionnal keywoard arguments :\n
         `dic_path`: str, path to the dictionary being written\n
-        `filetype`: str, accepts `text/plain` and `application/x-yaml`
+        `filetype`: str, accepts `text/plain`, `application/x-yaml`,
+        `application/x-motus-dic`, `application/x-motus-dawg` and
+        `application/x-motus-shards`\n
+        Files ending in `.gz`, `.bz2` or `.xz` are compressed accordingly.
         """
         super().config(dic_path, filetype)
 
@@ -313,40 +1506,211 @@ class Writer(FileHandler):
                        f'{self.inferred_filetype}')
             raise FileHandlingException(err_str)
 
-        return self._get_writer(self.filetype or self.inferred_filetype)
+        writer = self._get_writer(self.filetype or self.inferred_filetype)
+        return writer(dic, self.dic_path)
 
     @classmethod
     def _get_writer(cls, filetype):
-        if filetype == 'text/plain':
-            return cls._txt_writer
-        elif filetype == 'application/x-yaml':
-            return cls._yaml_writer
-        else:
-            raise FileHandlingException('Unknown filetype: {filetype}')
+        if filetype not in cls.WRITERS:
+            raise FileHandlingException(f'Unknown filetype: {filetype}')
+        return getattr(cls, cls.WRITERS[filetype])
 
     @classmethod
     def _txt_writer(cls, dic, path):
-        try:
-            file = open(path, 'w')
-            open_flag = True
-            for word in dic.words:
-                file.write(word + '\n')
-            file.close()
-            open_flag = False
-        except Exception:
-            if open_flag:
-                file.close()
-            raise
+        """Writes the words by batches of `BATCH_SIZE` lines"""
+        words = iter(dic.words)
+        with _atomic_open(path, 'w', cls._compression_of(path),
+                          buffering=Reader.CHUNK_SIZE) as file:
+            batch = list(islice(words, cls.BATCH_SIZE))
+            while batch:
+                batch.append('')
+                file.write('\n'.join(batch))
+                batch = list(islice(words, cls.BATCH_SIZE))
 
     @classmethod
     def _yaml_writer(cls, dic, path):
-        try:
-            file = open(path, 'w')
-            open_flag = True
-            yaml.dump(dic.content, file, default_flow_style=False)
-            file.close()
-            open_flag = False
-        except Exception:
-            if open_flag:
-                file.close()
-            raise
+        """Streams the content to a YAML emitter, libyaml's when available,
+        the output is the one of `yaml.dump`"""
+        events = chain(
+            [yaml.StreamStartEvent(), yaml.DocumentStartEvent()],
+            _yaml_events(dic.content),
+            [yaml.DocumentEndEvent(), yaml.StreamEndEvent()])
+        with _atomic_open(path, 'w', cls._compression_of(path),
+                          buffering=Reader.CHUNK_SIZE) as file:
+            yaml.emit(events, file, Dumper=YAML_DUMPER)
+
+    @classmethod
+    def _mdic_writer(cls, dic, path, lengths=None):
+        """`lengths`: list, only write the words of these lengths"""
+        if not isinstance(dic, CompactDic):
+            dic = CompactDic.from_dic(dic)
+
+        if lengths is None:
+            lengths = list(dic.content)
+        start = MDIC_HEADER.size + len(lengths) * MDIC_ENTRY.size
+        with _atomic_open(path, 'wb', cls._compression_of(path)) as file:
+            file.write(MDIC_HEADER.pack(MDIC_MAGIC, MDIC_VERSION, len(lengths)))
+            for length in lengths:
+                count = len(dic._buffers[length]) // length
+                file.write(MDIC_ENTRY.pack(length, count, start,
+                                           *dic._offsets[length]))
+                start += count * length
+            for length in lengths:
+                file.write(dic._buffers[length])
+
+    @classmethod
+    def _shards_writer(cls, dic, path):
+        """Writes one binary dic per length in the `path` directory. Shards
+        of lengths missing from the dic are removed."""
+        if not isinstance(dic, (CompactDic, ShardedDic)):
+            dic = CompactDic.from_dic(dic)
+
+        os.makedirs(path, exist_ok=True)
+        lengths = list(dic.content)
+        for name in os.listdir(path):
+            match = SHARD_NAME.fullmatch(name)
+            if match and int(match.group(1)) not in lengths:
+                os.remove(os.path.join(path, name))
+        for length in lengths:
+            shard = dic.shard(length) if isinstance(dic, ShardedDic) else dic
+            cls._mdic_writer(shard, os.path.join(path, f'{length}.mdic'),
+                             [length])
+
+    @classmethod
+    def _dawg_writer(cls, dic, path):
+        if isinstance(dic, DawgDic):
+            dawg = dic.dawg
+        else:
+            dawg = Dawg.build(sorted(set(dic.words)))
+
+        with _atomic_open(path, 'wb', cls._compression_of(path)) as file:
+            file.write(dawg.to_bytes())
+
+
+class PipelineStage:
+    """Iterable over the words leaving a stage of the build pipeline. \n
+    It counts the words and the time spent waiting for them, which includes
+    the time spent in the upstream stages."""
+    def __init__(self, name, words):
+        self.name = name
+        self.count = 0
+        self.elapsed = 0.0
+        self._words = iter(words)
+
+    def __iter__(self):
+        words = self._words
+        clock = time.perf_counter
+        while True:
+            start = clock()
+            try:
+                word = next(words)
+            except StopIteration:
+                self.elapsed += clock() - start
+                return
+            self.elapsed += clock() - start
+            self.count += 1
+            yield word
+
+
+def build(inputs, output, filetype=None, config=None, minlength=None,
+          maxlength=None, sort=False):
+    """Builds one dictionary from many word lists: read and clean, keep the
+    lengths in [`minlength`, `maxlength`], deduplicate, optionally sort by
+    length then alphabetically, and write. \n
+    Words stream from the inputs into a single Dic, which drops the
+    duplicates as they come, the writers needing the whole Dic.\n
+    `config`: str, substitutions file applied to every input\n
+    Returns a list of (stage, words in, words out, seconds) tuples, the
+    seconds being spent in the stage itself. Deduplication is not a stage of
+    its own: the seconds of the 'dedupe' row are the time spent inserting
+    the filtered words in the Dic."""
+    from motus.motus import DEFAULT_MAXLENGTH, DEFAULT_MINLENGTH
+    if minlength is None:
+        minlength = DEFAULT_MINLENGTH
+    if maxlength is None:
+        maxlength = DEFAULT_MAXLENGTH
+
+    def read():
+        for path in inputs:
+            yield from Reader(path, None, config).iter_words()
+
+    clock = time.perf_counter
+    read_stage = PipelineStage('read', read())
+    filter_stage = PipelineStage('filter', (
+        word for word in read_stage if minlength <= len(word) <= maxlength))
+    start = clock()
+    d = Dic.from_iterable(filter_stage)
+    count = len(d.words)
+    # Time of the insertions, the upstream stages running inside
+    insert_elapsed = clock() - start - filter_stage.elapsed
+    stats = [('read', read_stage.count, read_stage.count, read_stage.elapsed),
+             ('filter', read_stage.count, filter_stage.count,
+              filter_stage.elapsed - read_stage.elapsed),
+             ('dedupe', filter_stage.count, count, insert_elapsed)]
+
+    if sort:
+        start = clock()
+        d.sort()
+        stats.append(('sort', count, count, clock() - start))
+
+    start = clock()
+    Writer(output, filetype).write(d)
+    stats.append(('write', count, count, clock() - start))
+    return stats
+
+
+def _peak_memory():
+    """Returns the peak resident memory of the process in bytes, `None` when
+    the platform does not report it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _report(stats, peak):
+    lines = [f'{"stage":<8}{"words in":>12}{"words out":>12}'
+             f'{"seconds":>10}{"words/s":>12}']
+    for name, words_in, words_out, seconds in stats:
+        rate = words_in / seconds if seconds > 0 else 0
+        lines.append(f'{name:<8}{words_in:>12}{words_out:>12}'
+                     f'{seconds:>10.3f}{rate:>12.0f}')
+    if peak is not None:
+        lines.append(f'peak memory: {peak / (1 << 20):.1f} MiB')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m motus.dictools')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    build_parser = commands.add_parser(
+        'build', help='build a dictionary from word lists')
+    build_parser.add_argument('inputs', nargs='+', metavar='INPUT',
+                              help='word lists, in any readable format')
+    build_parser.add_argument('-o', '--output', required=True,
+                              help='dictionary to write')
+    build_parser.add_argument('-t', '--filetype',
+                              help='output filetype, inferred by default')
+    build_parser.add_argument('-c', '--config',
+                              help='substitutions file')
+    build_parser.add_argument('--min-length', type=int)
+    build_parser.add_argument('--max-length', type=int)
+    build_parser.add_argument('--sort', action='store_true',
+                              help='sort words by length then alphabetically')
+    args = parser.parse_args(argv)
+
+    try:
+        stats = build(args.inputs, args.output, args.filetype, args.config,
+                      args.min_length, args.max_length, args.sort)
+    except (FileHandlingException, ConfigFileException, OSError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+    print(_report(stats, _peak_memory()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import numpy as np
+
+from motus.cache import DicCache, words_digest
+from motus.motus import encode_words, evaluate_batch, letter_counts
+
+
+FEEDBACK_VERSION = 2
+# Cached matrices take at most this fraction of the cache size, a larger
+# one would evict most of the cache, then be evicted by the next entry
+MAX_CACHED_SHARE = 1 / 4
+
+
+def code_dtype(wordlength):
+    """Returns the smallest unsigned dtype holding the hint codes of words of
+    a given length, that is `3**wordlength - 1`"""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if 3 ** wordlength - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f'Hint codes of {wordlength} letters do not fit in 64 '
+                     f'bits')
+
+
+class FeedbackMatrix:
+    """Hint codes of every word sharing a length and an initial, as a guess,
+    against every one of them, as a solution. \n
+    `feedback[guess_id, solution_id]` is `evaluate_code(solution, guess)`,
+    ids being indices in `words`. The initial is known during a round and
+    words with another initial always get the all Wrong code 0, so a
+    matrix only covers one initial, see `blocks`. It is computed
+    `CHUNK_SIZE` guesses at a time.
+    """
+    CHUNK_SIZE = 1024
+
+    def __init__(self, words, codes):
+        self.words = words
+        self.codes = codes
+        self._ids = {word: i for i, word in enumerate(words)}
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, key):
+        return self.codes[key]
+
+    def index(self, word):
+        """Returns the id of a word, raises `KeyError` if it is unknown"""
+        return self._ids[word]
+
+    def ids(self, words):
+        """Returns the array of the ids of many words"""
+        return np.array([self._ids[word] for word in words], dtype=np.intp)
+
+    @staticmethod
+    def digest(words):
+        """Identifies an ordered list of words, see `words_digest`"""
+        return words_digest(words)
+
+    @staticmethod
+    def nbytes(words):
+        """Returns the size of the codes of a matrix of words"""
+        wordlength = len(words[0]) if words else 0
+        return len(words) ** 2 * code_dtype(wordlength).itemsize
+
+    @classmethod
+    def build(cls, words, path=None):
+        """Computes the matrix of words sharing a length and an initial. \n
+        `path`: str, writes the matrix to a `.npy` file mapped in memory
+        instead of allocating it"""
+        words = list(words)
+        wordlength = len(words[0]) if words else 0
+        if any(len(word) != wordlength or word[0] != words[0][0]
+               for word in words):
+            raise ValueError('Words of a feedback matrix must share a length '
+                             'and an initial')
+
+        dtype = code_dtype(wordlength)
+        shape = (len(words), len(words))
+        if path is None:
+            codes = np.zeros(shape, dtype=dtype)
+        else:
+            codes = np.lib.format.open_memmap(path, 'w+', dtype, shape)
+
+        solutions = encode_words(words, wordlength)
+        counts = (letter_counts(solutions) if solutions.dtype == np.uint8
+                  else None)
+        for start in range(0, len(words), cls.CHUNK_SIZE):
+            stop = min(start + cls.CHUNK_SIZE, len(words))
+            codes[start:stop] = [evaluate_batch(solutions, words[row], counts)
+                                 for row in range(start, stop)]
+
+        if path is not None:
+            codes.flush()
+        return cls(words, codes)
+
+    @classmethod
+    def cached(cls, words, cache=None):
+        """Returns the matrix of the words, memory-mapped from the cache
+        directory, building and storing it first if needed. A matrix larger
+        than `MAX_CACHED_SHARE` of the cache size is built in memory and not
+        stored.\n
+        `cache`: DicCache, the user cache directory by default"""
+        words = list(words)
+        cache = cache or DicCache()
+        if not words or cls.nbytes(words) > cache.max_size * MAX_CACHED_SHARE:
+            return cls.build(words)
+        key = cache.key('feedback', cls.digest(words), FEEDBACK_VERSION)
+        path = cache.get(key, '.npy')
+        if path is not None:
+            try:
+                codes = np.load(path, mmap_mode='r')
+            except (OSError, ValueError):
+                codes = None
+            if codes is not None and codes.shape == (len(words),) * 2:
+                return cls(words, codes)
+            cache.invalidate(key, '.npy')
+
+        path = cache.put(key, lambda tmp: cls.build(words, tmp), '.npy')
+        if path is None:
+            return cls.build(words)
+        return cls(words, np.load(path, mmap_mode='r'))
+
+    @classmethod
+    def from_dic(cls, dic, wordlength, initial, cache=True):
+        """Returns the matrix of the words of a Dic with a given length and
+        initial. \n
+        `cache`: bool or DicCache, persists the matrix in a cache directory
+        """
+        words = list(dic.iter_prefix(initial, wordlength))
+        if not cache:
+            return cls.build(words)
+        return cls.cached(words, None if cache is True else cache)
+
+    @classmethod
+    def blocks(cls, dic, wordlength, cache=True):
+        """Returns {initial: matrix} of the words of a given length of a
+        Dic, see `from_dic`"""
+        words = dic.iter_prefix('', wordlength)
+        initials = sorted({word[0] for word in words})
+        return {initial: cls.from_dic(dic, wordlength, initial, cache)
+                for initial in initials}
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from collections import Counter
+from functools import lru_cache
 import random
 
+import numpy as np
+
 from motus import dictools, player
 from motus.ui import UI
 
@@ -19,7 +21,7 @@ class Game(ABC):
     def load_dic(self, filename, filetype, pckg):
         """Returns the content of a dictionary given its filename"""
         rd = dictools.Reader()
-        rd.config(filename, filetype, None, pckg)
+        rd.config(filename, filetype, None, pckg, True)
         self.dic = rd.parse()
 
     @abstractmethod
@@ -28,9 +30,10 @@ class Game(ABC):
 
 
 class SoloGame(Game):
-    def __init__(self, filename, filetype=None, pckg=True):
+    def __init__(self, filename, filetype=None, pckg=True, validate=False):
         self.wins = 0
         self.rounds = 0
+        self.validate = validate
         self.player = player.HumanPlayer()
         super().__init__(filename, filetype, pckg)
 
@@ -45,7 +48,7 @@ class SoloGame(Game):
 
         replay = True
         while replay:
-            rd = SoloRound(self, wordlength)
+            rd = SoloRound(self, wordlength, self.validate)
             rd.play()
             UI.display_score_solo(self.wins, self.rounds)
             replay = UI.ask_replay()
@@ -66,13 +69,17 @@ class Round(ABC):
         all_words = self.game.dic.content[self.wordlength]
 
         first_letter = random.choice(list(all_words))
-        self.solution = random.choice(list(all_words[first_letter]))
+        self.solution = random.choice(all_words[first_letter])
 
     def evaluate(self, guess):
         return evaluate(self.solution, guess)
 
 
 class SoloRound(Round):
+    def __init__(self, game, wordlength, validate=False):
+        self.validate = validate
+        super().__init__(game, wordlength)
+
     def play(self):
         self.game.incr_rounds()
 
@@ -80,7 +87,7 @@ class SoloRound(Round):
         UI.display_first_word(self.solution[0])
 
         for i in range(DEFAULT_GUESSES):
-            guess = self.game.player.guess()
+            guess = self.prompt_guess()
 
             res, hints = self.evaluate(guess)
             UI.display_correction(guess, hints)
@@ -93,6 +100,16 @@ class SoloRound(Round):
         if not res:
             UI.display_solution(self.solution)
 
+    def prompt_guess(self):
+        """Asks the player for a guess. In validation mode, words missing
+        from the dictionary are rejected and the player is asked again."""
+        guess = self.game.player.guess()
+        while self.validate and guess not in self.game.dic:
+            UI.invalid_guess(guess)
+            guess = self.game.player.guess()
+
+        return guess
+
 
 def evaluate(solution, guess):
     """ Returns a tuple of a boolean and a hint string.
@@ -104,40 +121,191 @@ def evaluate(solution, guess):
     `M` Misplaced : Good letter in a bad place.\n
     `W` Wrong : Letter used too many times"""
     wordlength = len(solution)
+    code = evaluate_code(solution, guess)
+    return code == right_code(wordlength), decode_hint(code, wordlength)
 
-    # Obvious cases handling :
-    if len(guess) != wordlength or guess[0] != solution[0]:
-        return False, 'W' * wordlength
 
+def evaluate_code(solution, guess):
+    """Returns the hint of `evaluate` as an integer code, see `encode_hint`.
+    \n
+    Results are memoized once `enable_memo` was called."""
+    return _evaluate_code(solution, guess)
+
+
+def _compute_code(solution, guess):
+    wordlength = len(solution)
+    if len(guess) != wordlength or guess[0] != solution[0]:
+        return 0
     if guess == solution:
-        return True, 'R' * wordlength
+        return POWERS[wordlength] - 1
 
-    # Other cases, initialize with "all wrong" hint list
-    hints = ['W'] * wordlength
+    # Letters of the solution left for Misplaced hints
+    left = dict()
+    for right_letter, guessed_letter in zip(solution, guess):
+        if right_letter != guessed_letter:
+            left[right_letter] = left.get(right_letter, 0) + 1
 
-    # First pass: fill-up right guesses
-    letters = Counter(solution)
-    for i in range(len(solution)):
-        right_letter = solution[i]
-        guessed_letter = guess[i]
+    code = 0
+    for i, (right_letter, guessed_letter) in enumerate(zip(solution, guess)):
         if guessed_letter == right_letter:
-            hints[i] = 'R'
-            letters[guessed_letter] = letters[guessed_letter] - 1
+            code += 2 * POWERS[i]
+        elif left.get(guessed_letter, 0) > 0:
+            left[guessed_letter] -= 1
+            code += POWERS[i]
+    return code
 
-    # Second pass: fill-up misplaced guesses
-    for i in range(len(solution)):
-        right_letter = solution[i]
-        guessed_letter = guess[i]
 
-        if hints[i] == 'R':
-            continue
-
-        if guessed_letter in list(letters) and letters[guessed_letter] > 0:
-            hints[i] = 'M'
-            letters[guessed_letter] = letters[guessed_letter] - 1
+# Function behind `evaluate_code`, `_compute_code` or its memoized version
+_evaluate_code = _compute_code
+DEFAULT_MEMO_SIZE = 1 << 20
+
+
+def enable_memo(maxsize=DEFAULT_MEMO_SIZE):
+    """Memoizes `evaluate_code`, and so `evaluate` and `Player.matches`, in
+    a least recently used cache of `maxsize` (solution, guess) pairs. The
+    cache can be shared by threads. Enabling it again starts a new cache.
+    """
+    global _evaluate_code
+    _evaluate_code = lru_cache(maxsize=maxsize)(_compute_code)
+
+
+def disable_memo():
+    global _evaluate_code
+    _evaluate_code = _compute_code
+
+
+def memo_info():
+    """Returns the hits, misses, maxsize and currsize of the memo, `None`
+    when it is disabled"""
+    if _evaluate_code is _compute_code:
+        return None
+    return _evaluate_code.cache_info()
+
+
+def clear_memo():
+    if _evaluate_code is not _compute_code:
+        _evaluate_code.cache_clear()
+
+
+# Hint codes: letter `i` of a hint string is the base-3 digit of weight
+# `3**i`, W=0, M=1, R=2. All Wrong is 0, all Right is `3**wordlength - 1`.
+HINT_LETTERS = 'WMR'
+HINT_DIGITS = {'W': 0, 'M': 1, 'R': 2}
+POWERS = tuple(3 ** i for i in range(65))
+# Longest words whose hint strings are all kept in a `hint_table`
+HINT_TABLE_MAXLENGTH = 8
+
+
+def right_code(wordlength):
+    """Returns the code of the all Right hint"""
+    return POWERS[wordlength] - 1
+
+
+def encode_hint(hint_string):
+    """Returns the integer code of a hint string"""
+    return sum(HINT_DIGITS[hint] * POWERS[i]
+               for i, hint in enumerate(hint_string))
+
+
+def decode_hint(code, wordlength):
+    """Returns the hint string of an integer code"""
+    if wordlength <= HINT_TABLE_MAXLENGTH:
+        return hint_table(wordlength)[code]
+    hints = []
+    for _ in range(wordlength):
+        code, digit = divmod(code, 3)
+        hints.append(HINT_LETTERS[digit])
+    return ''.join(hints)
+
+
+@lru_cache(maxsize=None)
+def hint_table(wordlength):
+    """Returns the tuple of all the hint strings of a word length, indexed
+    by their code"""
+    table = ['']
+    for _ in range(wordlength):
+        table = [hints + letter for letter in HINT_LETTERS for hints in table]
+    return tuple(table)
+
+
+def encode_words(words, wordlength=None):
+    """Returns a (len(words), wordlength) array of the character codes of
+    same-length words, `uint8` when every character fits in a byte"""
+    words = list(words)
+    if wordlength is None:
+        wordlength = len(words[0]) if words else 0
+    text = ''.join(words)
+    try:
+        codes = np.frombuffer(text.encode('latin-1'), dtype=np.uint8)
+    except UnicodeEncodeError:
+        codes = np.array([ord(char) for char in text], dtype=np.uint32)
+    return codes.reshape(len(words), wordlength)
+
+
+def letter_counts(solutions):
+    """Returns the (n, 256) uint8 array of the number of occurrences of each
+    character code in each row of a `uint8` solutions array, to be reused by
+    `evaluate_batch` across guesses"""
+    solutions = np.asarray(solutions, dtype=np.uint8)
+    count, wordlength = solutions.shape
+    flat = (np.arange(count)[:, None] * 256 + solutions).ravel()
+    counts = np.bincount(flat, minlength=count * 256)
+    return counts.astype(np.uint8).reshape(count, 256)
+
 
-    hints = ''.join(hints)  # Convert hint list to hint string
-    return False, hints
+def _available_letters(solutions, letters, fits, right, counts=None):
+    """Returns {letter: occurrences in each solution among the non Right
+    positions} of the guessed letters, see `evaluate_batch`"""
+    available = dict()
+    for i, letter in enumerate(letters):
+        if not fits[i]:
+            continue
+        if letter not in available:
+            if counts is not None:
+                available[letter] = counts[:, letter].astype(np.intp)
+            else:
+                available[letter] = np.count_nonzero(solutions == letter,
+                                                     axis=1)
+        available[letter] -= right[:, i]
+    return available
+
+
+def evaluate_batch(solutions, guess, counts=None):
+    """Evaluates a guess against many solutions at once. \n
+    `solutions`: (n, wordlength) integer array of character codes, see
+    `encode_words` or the buffers of a `CompactDic`\n
+    `counts`: optional `letter_counts(solutions)`, saves a pass over the
+    solutions per guessed letter\n
+    Returns an int64 array of `n` hint codes, the `evaluate_code` of each
+    solution."""
+    solutions = np.asarray(solutions)
+    count, wordlength = solutions.shape
+    codes = np.zeros(count, dtype=np.int64)
+    if len(guess) != wordlength or count == 0:
+        return codes
+
+    letters = [ord(char) for char in guess]
+    # Characters the array cannot hold never match, they stay Wrong
+    fits = [letter <= np.iinfo(solutions.dtype).max for letter in letters]
+    if not fits[0]:
+        return codes
+    right = np.zeros(solutions.shape, dtype=bool)
+    for i, letter in enumerate(letters):
+        if fits[i]:
+            right[:, i] = solutions[:, i] == letter
+    available = _available_letters(solutions, letters, fits, right, counts)
+
+    weight = 1
+    for i, letter in enumerate(letters):
+        codes += 2 * weight * right[:, i]
+        if fits[i]:
+            misplaced = ~right[:, i] & (available[letter] > 0)
+            available[letter] -= misplaced
+            codes += weight * misplaced
+        weight *= 3
+
+    codes[solutions[:, 0] != letters[0]] = 0
+    return codes
 
 
 def main():
@@ -1,27 +1,213 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
 import random
 
+import numpy as np
+
 from motus import motus
 from motus.ui import UI
 
 
+class Constraint:
+    """Rule that a solution follows, compiled from (guess, hint string)
+    pairs. \n
+    `fixed`: {position: letter} of the solution\n
+    `excluded`: {position: letters} absent at these positions\n
+    `min_counts` and `max_counts`: {letter: number of occurrences}\n
+    Constraints of successive turns merge with `&` into a single rule.
+    """
+    def __init__(self, wordlength, fixed=None, excluded=None,
+                 min_counts=None, max_counts=None, satisfiable=True):
+        self.wordlength = wordlength
+        self.fixed = dict(fixed or {})
+        self.excluded = {position: frozenset(letters)
+                         for position, letters in (excluded or {}).items()}
+        self.min_counts = dict(min_counts or {})
+        self.max_counts = dict(max_counts or {})
+        self.satisfiable = satisfiable and self._consistent()
+
+    @classmethod
+    def from_hint(cls, guess, hint_string):
+        """Compiles the words `w` of the hint's length such that
+        `evaluate(w, guess)` gives `hint_string`"""
+        wordlength = len(hint_string)
+        if any(hint not in motus.HINT_DIGITS for hint in hint_string):
+            raise ValueError(f'Invalid hint string {hint_string!r}')
+        if wordlength == 0:
+            return cls(0)
+        all_wrong = set(hint_string) == {'W'}
+        if len(guess) != wordlength:
+            # Every word gets the all Wrong hint
+            return cls(wordlength, satisfiable=all_wrong)
+        if hint_string[0] != 'R':
+            # Only words with another initial get a Wrong first letter
+            return cls(wordlength, excluded={0: guess[0]},
+                       satisfiable=all_wrong)
+
+        fixed = dict()
+        excluded = dict()
+        min_counts = dict()
+        max_counts = dict()
+        wrong = set()
+        satisfiable = True
+        for position, (letter, hint) in enumerate(zip(guess, hint_string)):
+            if hint == 'R':
+                fixed[position] = letter
+            else:
+                excluded.setdefault(position, set()).add(letter)
+            if hint == 'W':
+                wrong.add(letter)
+            else:
+                # Misplaced hints go to the leftmost occurrences first
+                satisfiable &= not (hint == 'M' and letter in wrong)
+                min_counts[letter] = min_counts.get(letter, 0) + 1
+        for letter in wrong:
+            max_counts[letter] = min_counts.get(letter, 0)
+        return cls(wordlength, fixed, excluded, min_counts, max_counts,
+                   satisfiable)
+
+    def _consistent(self):
+        for position, letter in self.fixed.items():
+            if letter in self.excluded.get(position, ()):
+                return False
+        for letter, count in self.min_counts.items():
+            if count > self.max_counts.get(letter, count):
+                return False
+        return sum(self.min_counts.values()) <= self.wordlength
+
+    def merge(self, other):
+        """Returns the constraint of the words following both constraints"""
+        if self.wordlength != other.wordlength:
+            return type(self)(self.wordlength, satisfiable=False)
+        fixed = dict(self.fixed)
+        for position, letter in other.fixed.items():
+            if fixed.setdefault(position, letter) != letter:
+                return type(self)(self.wordlength, satisfiable=False)
+        excluded = dict(self.excluded)
+        for position, letters in other.excluded.items():
+            excluded[position] = excluded.get(position, frozenset()) | letters
+        min_counts = dict(self.min_counts)
+        for letter, count in other.min_counts.items():
+            min_counts[letter] = max(min_counts.get(letter, 0), count)
+        max_counts = dict(self.max_counts)
+        for letter, count in other.max_counts.items():
+            max_counts[letter] = min(max_counts.get(letter, count), count)
+        return type(self)(self.wordlength, fixed, excluded, min_counts,
+                          max_counts,
+                          self.satisfiable and other.satisfiable)
+
+    __and__ = merge
+
+    def matches(self, word):
+        """Checks a word, cheapest and most selective tests first"""
+        if not self.satisfiable or len(word) != self.wordlength:
+            return False
+        for position, letter in self.fixed.items():
+            if word[position] != letter:
+                return False
+        for position, letters in self.excluded.items():
+            if word[position] in letters:
+                return False
+        for letter, count in self.max_counts.items():
+            if word.count(letter) > count:
+                return False
+        for letter, count in self.min_counts.items():
+            if word.count(letter) < count:
+                return False
+        return True
+
+    __call__ = matches
+
+    def filter(self, words):
+        """Returns the list of the matching words, in their order. \n
+        Each test runs as its own pass over the words left by the previous
+        ones, so the first letter and the other fixed letters, which discard
+        most words, spare the later passes."""
+        if not self.satisfiable:
+            return []
+        length = self.wordlength
+        words = [word for word in words if len(word) == length]
+        for position, letter in self.fixed.items():
+            words = [word for word in words if word[position] == letter]
+        for position, letters in self.excluded.items():
+            words = [word for word in words if word[position] not in letters]
+        for letter, count in self.max_counts.items():
+            words = [word for word in words if word.count(letter) <= count]
+        for letter, count in self.min_counts.items():
+            words = [word for word in words if word.count(letter) >= count]
+        return words
+
+    def query(self, dic):
+        """Returns the matching words of a `Dic`, answered by its positional
+        index instead of a scan"""
+        if not self.satisfiable:
+            return []
+        return dic.query(self.wordlength, self.fixed,
+                         min_counts=self.min_counts,
+                         max_counts=self.max_counts, excluded=self.excluded)
+
+
+class SolverState:
+    """Candidates and history of one game. \n
+    `candidates`: tuple of the words following every hint given so far\n
+    `history`: tuple of the (guess, hint string) pairs given so far\n
+    `constraint`: merged Constraint of the history, `None` before the first
+    hint\n
+    Candidates and history are immutable tuples: forks share them until a
+    hint replaces them, so a fork costs the same whatever the number of
+    candidates, and many games can start from one tuple of words."""
+    def __init__(self, candidates=(), history=(), constraint=None):
+        self.candidates = tuple(candidates)
+        self.history = tuple(history)
+        self.constraint = constraint
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def give_hint(self, guess, hint_string):
+        """Keeps the candidates matching a hint. The candidates already
+        follow the previous hints, so only the constraint of this hint is
+        checked."""
+        constraint = Constraint.from_hint(guess, hint_string)
+        self.candidates = tuple(constraint.filter(self.candidates))
+        self.history += ((guess, hint_string),)
+        self.constraint = (constraint if self.constraint is None
+                           else self.constraint & constraint)
+
+    def fork(self):
+        """Returns an independent state sharing the candidates"""
+        return type(self)(self.candidates, self.history, self.constraint)
+
+    def after(self, guess, hint_string):
+        """Returns a fork given one more hint, this state is unchanged"""
+        state = self.fork()
+        state.give_hint(guess, hint_string)
+        return state
+
+
 class Player(ABC):
-    universe = None
+    def __init__(self, state=None):
+        self.state = SolverState() if state is None else state
 
-    def __init__(self):
-        pass
+    @property
+    def universe(self):
+        """Candidate words of the current game"""
+        return self.state.candidates
+
+    @universe.setter
+    def universe(self, words):
+        self.state = SolverState(words)
 
     @classmethod
     def matches(cls, word, guess, hint_string):
         """ Checks if a word matches a rule given by a combination of
         a guess and corresponding hint_sting"""
-        return motus.evaluate(word, guess)[1] == hint_string
+        return (motus.evaluate_code(word, guess)
+                == motus.encode_hint(hint_string))
 
-    @classmethod
-    def give_hint(cls, guess, hint_string):
-        """ Updates the universe of possible words for all the players """
-        cls.universe = [word for word in cls.universe
-                        if cls.matches(word, guess, hint_string)]
+    def give_hint(self, guess, hint_string):
+        """ Updates the candidate words of the player's game """
+        self.state.give_hint(guess, hint_string)
 
     @abstractmethod
     def guess(self):
@@ -37,18 +223,34 @@ class HumanPlayer(Player):
 
 
 class BotPlayer(Player):
-    def __init__(self, strategy):
+    """Player guessing with a Strategy. \n
+    `book`: OpeningBook, precomputed first moves of the strategy, played
+    instead of searching when the game is in the book"""
+    def __init__(self, strategy, state=None, book=None):
         self.strategy = strategy
-        super().__init__()
+        self.book = book
+        super().__init__(state)
 
     def guess(self):
-        return self.strategy.guess(type(self).universe)
+        if self.book is not None:
+            guess = self.book.get(self.state)
+            if guess is not None:
+                return guess
+        return self.strategy.guess(self.state.candidates)
 
 
 class Strategy(ABC):
     def __init__(self):
         pass
 
+    def __repr__(self):
+        """Identifies the strategy by its class and public attributes, the
+        same for every instance with the same parameters"""
+        parameters = ', '.join(f'{name}={value!r}'
+                               for name, value in sorted(vars(self).items())
+                               if not name.startswith('_'))
+        return f'{type(self).__name__}({parameters})'
+
     @abstractmethod
     def guess(self, universe):
         """ Returns a guess based on the universe of all possible words"""
@@ -59,3 +261,133 @@ class RandomStrategy(Strategy):
     def guess(self, universe):
         k = random.randint(0, len(universe)-1)
         return universe[k]
+
+
+def _partition_scores(strategy, solutions, guesses, counts=None):
+    """Returns the `strategy.score` of each guess. The solutions are
+    partitioned by the hint the guess gets, in one `evaluate_batch` pass.\n
+    `solutions` and `counts`: see `motus.evaluate_batch`"""
+    scores = np.zeros(len(guesses))
+    for i, guess in enumerate(guesses):
+        codes = motus.evaluate_batch(solutions, guess, counts)
+        scores[i] = strategy.score(np.unique(codes, return_counts=True)[1])
+    return scores
+
+
+class PartitionStrategy(Strategy):
+    """Guesses the candidate whose hints split the candidates best, the
+    equally likely solutions getting the same hint forming a bucket.
+    Subclasses rate a split in `score`. \n
+    Large universes are sampled: at most `max_guesses` candidates are
+    scored, against at most `max_solutions` of them. Samples are drawn from
+    `seed`, so the same universe always gives the same guess.\n
+    `workers`: int, number of processes scoring the candidates when there
+    are more than `PARALLEL_MIN_EVALUATIONS` hints to compute. They start
+    on first use and serve every later guess until `close`, or the end of a
+    `with` block on the strategy."""
+    MAX_GUESSES = 512
+    MAX_SOLUTIONS = 4096
+    PARALLEL_MIN_EVALUATIONS = 1 << 22
+
+    def __init__(self, max_guesses=MAX_GUESSES, max_solutions=MAX_SOLUTIONS,
+                 seed=0, workers=None):
+        self.max_guesses = max_guesses
+        self.max_solutions = max_solutions
+        self.seed = seed
+        self.workers = workers
+        self._pool = None
+        super().__init__()
+
+    def __getstate__(self):
+        """Pickles the strategy without its worker processes"""
+        state = dict(self.__dict__)
+        state['_pool'] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stops the worker processes, they start again when needed"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __repr__(self):
+        """Identifies the guesses of the strategy, workers do not change
+        them"""
+        return (f'{type(self).__name__}(max_guesses={self.max_guesses}, '
+                f'max_solutions={self.max_solutions}, seed={self.seed!r})')
+
+    @abstractmethod
+    def score(self, sizes):
+        """Returns the rating of a guess given the array of the sizes of its
+        buckets, the higher the better"""
+        pass
+
+    def guess(self, universe):
+        """ Returns the best guess among same-length candidate words, the
+        first one in universe order on ties"""
+        if len(universe) <= 2:
+            return universe[0]
+        rng = random.Random(self.seed)
+        guesses = self._sample(universe, self.max_guesses, rng)
+        solutions = motus.encode_words(
+            self._sample(universe, self.max_solutions, rng))
+        counts = (motus.letter_counts(solutions)
+                  if solutions.dtype == np.uint8 else None)
+
+        scores = self.scores(solutions, guesses, counts)
+        return guesses[int(np.argmax(scores))]
+
+    @staticmethod
+    def _sample(universe, size, rng):
+        """Returns `size` candidates at most, in universe order"""
+        if len(universe) <= size:
+            return list(universe)
+        return [universe[i] for i in sorted(rng.sample(range(len(universe)),
+                                                       size))]
+
+    def scores(self, solutions, guesses, counts=None):
+        """Returns the score of each guess, see `_partition_scores`"""
+        workers = self.workers or 1
+        if (workers < 2 or len(guesses) * len(solutions)
+                < self.PARALLEL_MIN_EVALUATIONS):
+            return _partition_scores(self, solutions, guesses, counts)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+        size = -(-len(guesses) // workers)
+        chunks = [guesses[i:i + size] for i in range(0, len(guesses), size)]
+        scores = self._pool.map(_partition_scores, [self] * len(chunks),
+                                [solutions] * len(chunks), chunks,
+                                [counts] * len(chunks))
+        return np.concatenate(list(scores))
+
+
+class EntropyStrategy(PartitionStrategy):
+    """Guesses the candidate whose hint tells the most about the solution,
+    the one whose buckets have the highest entropy"""
+    def score(self, sizes):
+        """Returns the entropy of the hint in bits"""
+        total = sizes.sum()
+        return np.log2(total) - np.dot(sizes, np.log2(sizes)) / total
+
+
+class MinimaxStrategy(PartitionStrategy):
+    """Guesses the candidate leaving the fewest candidates in the worst
+    case, the one whose largest bucket is the smallest"""
+    def score(self, sizes):
+        return -sizes.max()
+
+
+class ExpectedSizeStrategy(PartitionStrategy):
+    """Guesses the candidate leaving the fewest candidates on average, the
+    solution being in a bucket with a probability proportional to its size
+    """
+    def score(self, sizes):
+        """Returns the opposite of the expected number of candidates left"""
+        return -np.dot(sizes, sizes) / sizes.sum()
@@ -0,0 +1,211 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from motus import dictools
+from motus.book import OpeningBook
+from motus.motus import DEFAULT_GUESSES, evaluate
+from motus.player import (BotPlayer, EntropyStrategy, ExpectedSizeStrategy,
+                          MinimaxStrategy, PartitionStrategy, RandomStrategy,
+                          SolverState)
+
+
+STRATEGIES = {'random': RandomStrategy, 'entropy': EntropyStrategy,
+              'minimax': MinimaxStrategy,
+              'expected-size': ExpectedSizeStrategy}
+LATENCY_PERCENTILES = (50, 90, 99)
+# Rounds played by a process at once, chunks do not depend on the number of
+# processes so that a seed gives the same games whatever the pool
+CHUNK_ROUNDS = 32
+
+
+def play_round(strategy, universe, solution, guesses=DEFAULT_GUESSES,
+               book=None):
+    """Plays a round without UI, the bot starting from the words sharing the
+    length and initial of the solution. \n
+    Returns the number of guesses of a won round, `None` if it is lost, and
+    the list of the seconds the bot took to find each guess."""
+    bot = BotPlayer(strategy, SolverState(universe), book)
+    clock = time.perf_counter
+    latencies = []
+    for turn in range(1, guesses + 1):
+        start = clock()
+        guess = bot.guess()
+        latencies.append(clock() - start)
+        right, hint = evaluate(solution, guess)
+        if right:
+            return turn, latencies
+        bot.give_hint(guess, hint)
+    return None, latencies
+
+
+def sample_solutions(universes, rounds, rng):
+    """Picks solutions like `Round.pick_solution`, an initial then a word of
+    this initial. \n
+    `universes`: {initial: words}"""
+    initials = sorted(universes)
+    solutions = []
+    for _ in range(rounds):
+        solutions.append(rng.choice(universes[rng.choice(initials)]))
+    return solutions
+
+
+def _play_rounds(strategy, universes, solutions, guesses, book, seed):
+    """Plays the rounds of a chunk. The random module is seeded for the
+    strategies drawing from it."""
+    random.seed(seed)
+    return [play_round(strategy, universes[solution[0]], solution, guesses,
+                       book)
+            for solution in solutions]
+
+
+def _summary(results, seconds):
+    turns = [turn for turn, _ in results]
+    won = [turn for turn in turns if turn is not None]
+    latencies = [latency for _, round_latencies in results
+                 for latency in round_latencies]
+
+    distribution = dict()
+    for turn in sorted(won):
+        distribution[str(turn)] = distribution.get(str(turn), 0) + 1
+    if len(won) < len(turns):
+        distribution['lost'] = len(turns) - len(won)
+
+    latency_ms = dict()
+    if latencies:
+        latencies = np.array(latencies) * 1000
+        for percentile in LATENCY_PERCENTILES:
+            latency_ms[f'p{percentile}'] = float(
+                np.percentile(latencies, percentile))
+        latency_ms['max'] = float(latencies.max())
+
+    return {
+        'rounds': len(results),
+        'wins': len(won),
+        'win_rate': len(won) / len(results) if results else 0.0,
+        'mean_guesses': sum(won) / len(won) if won else None,
+        'guesses': distribution,
+        'latency_ms': latency_ms,
+        'seconds': seconds,
+        'games_per_second': len(results) / seconds if seconds > 0 else None,
+    }
+
+
+def simulate(dic, strategy, lengths, rounds, seed=0, workers=None,
+             guesses=DEFAULT_GUESSES, book=None):
+    """Plays `rounds` rounds per word length of a Dic with a bot. \n
+    `seed`: seeds the choice of the solutions, and the random module of the
+    processes for the strategies drawing from it\n
+    `workers`: int, number of processes playing the rounds\n
+    `book`: OpeningBook of the strategy, see `BotPlayer`\n
+    Returns the report of each length and of all of them, see `_summary`.
+    """
+    rng = random.Random(seed)
+    report = {'strategy': repr(strategy), 'seed': seed,
+              'rounds_per_length': rounds, 'workers': workers or 1,
+              'lengths': dict()}
+    pool = None
+    if workers is not None and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    all_results = []
+    total = 0.0
+    try:
+        for length in lengths:
+            universes = {universe[0][0]: tuple(universe) for universe in
+                         OpeningBook.universes(dic.iter_prefix('', length))}
+            solutions = (sample_solutions(universes, rounds, rng)
+                         if universes else [])
+            chunks = [solutions[i:i + CHUNK_ROUNDS]
+                      for i in range(0, len(solutions), CHUNK_ROUNDS)]
+            args = [[strategy] * len(chunks),
+                    [{solution[0]: universes[solution[0]]
+                      for solution in chunk} for chunk in chunks],
+                    chunks, [guesses] * len(chunks), [book] * len(chunks),
+                    [rng.getrandbits(32) for _ in chunks]]
+
+            start = time.perf_counter()
+            if pool is None:
+                results = map(_play_rounds, *args)
+            else:
+                results = pool.map(_play_rounds, *args)
+            results = [result for chunk in results for result in chunk]
+            seconds = time.perf_counter() - start
+
+            report['lengths'][str(length)] = _summary(results, seconds)
+            all_results.extend(results)
+            total += seconds
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    report['total'] = _summary(all_results, total)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m motus.simulate',
+        description='play bot rounds without UI and report as JSON')
+    parser.add_argument('dic', metavar='DIC', help='dictionary file')
+    parser.add_argument('-t', '--filetype',
+                        help='dictionary filetype, inferred by default')
+    parser.add_argument('-p', '--package', action='store_true',
+                        help='read the dictionary from the package')
+    parser.add_argument('-l', '--lengths', nargs='+', type=int,
+                        required=True, metavar='LENGTH')
+    parser.add_argument('-n', '--rounds', type=int, default=100,
+                        help='rounds per length')
+    parser.add_argument('-s', '--strategy', choices=sorted(STRATEGIES),
+                        default='entropy')
+    parser.add_argument('--max-guesses', type=int,
+                        default=PartitionStrategy.MAX_GUESSES,
+                        help='candidates scored by the strategy')
+    parser.add_argument('--max-solutions', type=int,
+                        default=PartitionStrategy.MAX_SOLUTIONS,
+                        help='solutions sampled by the strategy')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-w', '--workers', type=int,
+                        help='processes playing the rounds')
+    parser.add_argument('--book', action='store_true',
+                        help='use a cached opening book of the strategy')
+    parser.add_argument('-o', '--output', help='report file, stdout by '
+                                               'default')
+    args = parser.parse_args(argv)
+
+    cls = STRATEGIES[args.strategy]
+    if issubclass(cls, PartitionStrategy):
+        strategy = cls(args.max_guesses, args.max_solutions, args.seed)
+    elif args.book:
+        parser.error(f'the {args.strategy} strategy has no opening book')
+    else:
+        strategy = cls()
+
+    try:
+        dic = dictools.Reader(args.dic, args.filetype, None, args.package,
+                              True).parse()
+        book = None
+        if args.book:
+            book = OpeningBook.from_dic(dic, strategy, args.lengths)
+        report = simulate(dic, strategy, args.lengths, args.rounds,
+                          args.seed, args.workers, book=book)
+        if args.output is None:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, 'w') as file:
+                json.dump(report, file, indent=2)
+    except (dictools.FileHandlingException, dictools.ConfigFileException,
+            OSError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -41,6 +41,10 @@ class UI:
         clean_guess = guess.upper().strip()
         return clean_guess
 
+    @classmethod
+    def invalid_guess(cls, guess):
+        print(f'{guess} is not in the dictionary, try another word.')
+
     @classmethod
     def right_guess(cls, solution):
         print(f'Congratulations, {solution} was the right answer !')
@@ -0,0 +1,146 @@
+import io
+import tempfile
+import unittest
+from unittest import mock
+
+from motus import motus
+from motus.book import OpeningBook
+from motus.cache import DicCache, words_digest
+from motus.dictools import Dic
+from motus.player import (BotPlayer, EntropyStrategy, MinimaxStrategy,
+                          RandomStrategy, SolverState)
+
+WORDS = ['BANANA', 'BANANE', 'BAMBOO', 'BIKINI', 'BOUNTY', 'BONBON',
+         'BOUGIE', 'BRANDI', 'ABACUS', 'ANANAS', 'AMBRES']
+
+
+class OpeningBookTestBuild(unittest.TestCase):
+    def setUp(self):
+        self.strategy = EntropyStrategy()
+        self.universes = OpeningBook.universes(WORDS)
+
+    def test_universes(self):
+        self.assertEqual(self.universes,
+                         [WORDS[:8], ['ABACUS', 'ANANAS', 'AMBRES']])
+
+    def test_build(self):
+        book = OpeningBook.build(self.strategy, self.universes)
+        for universe in self.universes:
+            state = SolverState(universe)
+            first = self.strategy.guess(state.candidates)
+            self.assertEqual(book.get(state), first)
+            for solution in universe:
+                if solution == first:
+                    continue
+                reply = state.after(first, motus.evaluate(solution, first)[1])
+                expected = (None if len(reply) == 1
+                            else self.strategy.guess(reply.candidates))
+                self.assertEqual(book.get(reply), expected)
+
+    def test_depth(self):
+        book = OpeningBook.build(self.strategy, self.universes, depth=1)
+        self.assertEqual(len(book), 2)
+        state = SolverState(self.universes[0])
+        guess = book.get(state)
+        self.assertIsNotNone(guess)
+        state.give_hint(guess, motus.evaluate('BRANDI', guess)[1])
+        self.assertIsNone(book.get(state))
+
+    def test_get_unknown(self):
+        book = OpeningBook.build(self.strategy, self.universes)
+        self.assertIsNone(book.get(SolverState(WORDS)))
+        self.assertIsNone(book.get(SolverState()))
+
+    def test_dump_load(self):
+        book = OpeningBook.build(self.strategy, self.universes)
+        file = io.StringIO()
+        book.dump(file)
+        file.seek(0)
+        loaded = OpeningBook.load(file)
+        self.assertEqual(loaded.moves, book.moves)
+        self.assertEqual(loaded.depth, book.depth)
+        with self.assertRaises(ValueError):
+            OpeningBook.load(io.StringIO('{"version": 0}'))
+
+
+class OpeningBookTestCache(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache = DicCache(tmp_dir.name)
+
+    def test_cached(self):
+        book = OpeningBook.cached(EntropyStrategy(), WORDS, cache=self.cache)
+        self.assertEqual(len(self.cache.entries()), 1)
+        with mock.patch.object(OpeningBook, 'build') as build_mock:
+            cached = OpeningBook.cached(EntropyStrategy(), WORDS,
+                                        cache=self.cache)
+        build_mock.assert_not_called()
+        self.assertEqual(cached.moves, book.moves)
+
+    def test_cached_by_strategy(self):
+        OpeningBook.cached(EntropyStrategy(), WORDS, cache=self.cache)
+        OpeningBook.cached(EntropyStrategy(seed=1), WORDS, cache=self.cache)
+        OpeningBook.cached(MinimaxStrategy(), WORDS, cache=self.cache)
+        OpeningBook.cached(EntropyStrategy(workers=2), WORDS,
+                           cache=self.cache)
+        OpeningBook.cached(EntropyStrategy(), WORDS, 1, self.cache)
+        self.assertEqual(len(self.cache.entries()), 4)
+
+    def test_cached_key_is_stable(self):
+        for cls in (RandomStrategy, EntropyStrategy):
+            self.cache.clear()
+            OpeningBook.cached(cls(), WORDS, cache=self.cache)
+            with mock.patch.object(OpeningBook, 'build') as build_mock:
+                OpeningBook.cached(cls(), WORDS, cache=self.cache)
+            build_mock.assert_not_called()
+            self.assertEqual(len(self.cache.entries()), 1)
+
+    def test_cached_corrupt(self):
+        book = OpeningBook.cached(EntropyStrategy(), WORDS, cache=self.cache)
+        _, _, path = self.cache.entries()[0]
+        with open(path, 'w') as file:
+            file.write('garbage')
+        cached = OpeningBook.cached(EntropyStrategy(), WORDS,
+                                    cache=self.cache)
+        self.assertEqual(cached.moves, book.moves)
+
+    def test_from_dic(self):
+        d = Dic()
+        d.content = WORDS + ['ASPIC', 'AMBRE']
+        book = OpeningBook.from_dic(d, EntropyStrategy(), [5, 6], cache=False)
+        self.assertEqual(self.cache.entries(), [])
+        cached = OpeningBook.from_dic(d, EntropyStrategy(), [5, 6],
+                                      cache=self.cache)
+        self.assertEqual(cached.moves, book.moves)
+        self.assertEqual(len(self.cache.entries()), 2)
+        universe = list(d.iter_prefix('A', 5))
+        self.assertIn(words_digest(universe), book.moves)
+
+
+class OpeningBookTestBotPlayer(unittest.TestCase):
+    def test_bot_uses_book(self):
+        strategy = EntropyStrategy()
+        universe = OpeningBook.universes(WORDS)[0]
+        book = OpeningBook.build(strategy, [universe])
+        bot = BotPlayer(strategy, SolverState(universe), book)
+        with mock.patch.object(EntropyStrategy, 'guess') as guess_mock:
+            guess = bot.guess()
+        guess_mock.assert_not_called()
+        self.assertEqual(guess, strategy.guess(universe))
+
+    def test_bot_falls_back(self):
+        strategy = EntropyStrategy()
+        book = OpeningBook.build(strategy, OpeningBook.universes(WORDS),
+                                 depth=1)
+        bot = BotPlayer(strategy, SolverState(WORDS[:8]), book)
+        guess = bot.guess()
+        bot.give_hint(guess, motus.evaluate('BRANDI', guess)[1])
+        with mock.patch.object(EntropyStrategy, 'guess',
+                               return_value='BRANDI') as guess_mock:
+            self.assertEqual(bot.guess(), 'BRANDI')
+        guess_mock.assert_called_once_with(bot.state.candidates)
+
+
+if __name__ == '__main__':
+    unittest.main()
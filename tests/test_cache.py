@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from motus.cache import DicCache, cache_dir
+
+
+class CacheTestCacheDir(unittest.TestCase):
+    def test_cache_dir_env(self):
+        with mock.patch.dict(os.environ, {'MOTUS_CACHE_DIR': '/tmp/m',
+                                          'XDG_CACHE_HOME': '/tmp/x'}):
+            self.assertEqual(cache_dir(), '/tmp/m')
+
+    def test_cache_dir_xdg(self):
+        with mock.patch.dict(os.environ, {'MOTUS_CACHE_DIR': '',
+                                          'XDG_CACHE_HOME': '/tmp/x'}):
+            self.assertEqual(cache_dir(), os.path.join('/tmp/x', 'motus'))
+
+    def test_cache_dir_default(self):
+        with mock.patch.dict(os.environ, {'MOTUS_CACHE_DIR': '',
+                                          'XDG_CACHE_HOME': ''}):
+            self.assertEqual(cache_dir(), os.path.join(
+                os.path.expanduser('~'), '.cache', 'motus'))
+
+
+class CacheTestBasic(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+        self.cache = DicCache(os.path.join(self.tmp_dir, 'cache'),
+                              max_size=100)
+
+    def _write(self, data):
+        def write(path):
+            with open(path, 'wb') as file:
+                file.write(data)
+        return write
+
+    def _put(self, key, size):
+        path = self.cache.put(key, self._write(b'x' * size))
+        # Make sure entries have distinct last use times
+        os.utime(path, (len(self.cache.entries()),) * 2)
+        return path
+
+
+class CacheTestKeys(CacheTestBasic):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.tmp_dir, 'words.txt')
+        with open(self.source, 'w') as file:
+            file.write('ASPIC\n')
+
+    def test_key(self):
+        self.assertEqual(DicCache.key('a', 1), DicCache.key('a', 1))
+        self.assertNotEqual(DicCache.key('a', 1), DicCache.key('a', 2))
+
+    def test_source_key_missing(self):
+        self.assertIsNone(self.cache.source_key('missing.txt'))
+
+    def test_source_key_changes(self):
+        key = self.cache.source_key(self.source, 'text/plain')
+        self.assertEqual(key, self.cache.source_key(self.source,
+                                                    'text/plain'))
+        self.assertNotEqual(key, self.cache.source_key(self.source, 'other'))
+        with open(self.source, 'a') as file:
+            file.write('ANNEE\n')
+        self.assertNotEqual(key, self.cache.source_key(self.source,
+                                                       'text/plain'))
+
+    def test_source_key_content_hash(self):
+        self.cache.content_hash = True
+        key = self.cache.source_key(self.source)
+        os.utime(self.source, (0, 0))
+        self.assertEqual(key, self.cache.source_key(self.source))
+        with open(self.source, 'w') as file:
+            file.write('ANNEE\n')
+        self.assertNotEqual(key, self.cache.source_key(self.source))
+
+
+class CacheTestEntries(CacheTestBasic):
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_put_get(self):
+        path = self.cache.put('key', self._write(b'data'), '.bin')
+        self.assertEqual(path, self.cache.get('key', '.bin'))
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), b'data')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_put_failing(self):
+        def write(path):
+            raise ValueError
+        with self.assertRaises(ValueError):
+            self.cache.put('key', write)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_put_unwritable(self):
+        self.cache.directory = os.path.join(self.tmp_dir, 'file')
+        open(self.cache.directory, 'w').close()
+        self.assertIsNone(self.cache.put('key', self._write(b'data')))
+
+    def test_invalidate(self):
+        self.cache.put('key', self._write(b'data'))
+        self.cache.invalidate('key')
+        self.cache.invalidate('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_clear(self):
+        self._put('a', 10)
+        self._put('b', 10)
+        self.cache.clear()
+        self.assertEqual(self.cache.entries(), [])
+
+
+class CacheTestEviction(CacheTestBasic):
+    def test_evict_least_recently_used(self):
+        self._put('a', 40)
+        self._put('b', 40)
+        self.cache.get('a')
+        self._put('c', 40)
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertLessEqual(self.cache.size(), 100)
+
+    def test_evict_keeps_new_entry(self):
+        self._put('a', 40)
+        self._put('big', 400)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('big'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from motus.dawg import Dawg, DawgException
+
+
+WORDS = sorted([
+    'ART', 'ARTS', 'AIR', 'AIRS', 'ASPIC', 'APRES', 'ARRET', 'ACTIF',
+    'BELLE', 'BIERE', 'BUTTE', 'BUTTES', 'TAIRE', 'TARTE', 'TARTES',
+])
+
+
+class DawgTestBuild(unittest.TestCase):
+    def test_build_empty(self):
+        dawg = Dawg.build([])
+        self.assertEqual(len(dawg), 0)
+        self.assertEqual(list(dawg), [])
+        self.assertNotIn('A', dawg)
+        self.assertEqual(dawg.lengths(), [])
+
+    def test_build_deduplicates(self):
+        dawg = Dawg.build(['ART', 'ART', 'ARTS'])
+        self.assertEqual(len(dawg), 2)
+        self.assertEqual(list(dawg), ['ART', 'ARTS'])
+
+    def test_build_unsorted(self):
+        with self.assertRaises(ValueError):
+            Dawg.build(['BELLE', 'ART'])
+
+    def test_build_shares_suffixes(self):
+        dawg = Dawg.build(['BELLES', 'CELLES', 'DELLES'])
+        trie_nodes = 1 + 3 * 6
+        self.assertEqual(len(dawg.finals), 1 + 6)
+        self.assertLess(len(dawg.finals), trie_nodes)
+
+
+class DawgTestQueries(unittest.TestCase):
+    def setUp(self):
+        self.dawg = Dawg.build(WORDS)
+
+    def test_iter(self):
+        self.assertEqual(list(self.dawg), WORDS)
+        self.assertEqual(len(self.dawg), len(WORDS))
+
+    def test_contains(self):
+        for word in WORDS:
+            self.assertIn(word, self.dawg)
+        for word in ['', 'A', 'AR', 'ARTSS', 'BUT', 'TARTEE', 'ÉTÉ']:
+            self.assertNotIn(word, self.dawg)
+
+    def test_iter_prefix(self):
+        self.assertEqual(list(self.dawg.iter_prefix('AR')),
+                         ['ARRET', 'ART', 'ARTS'])
+        self.assertEqual(list(self.dawg.iter_prefix('TARTE')),
+                         ['TARTE', 'TARTES'])
+        self.assertEqual(list(self.dawg.iter_prefix('Z')), [])
+
+    def test_iter_prefix_length(self):
+        self.assertEqual(list(self.dawg.iter_prefix('A', 4)), ['AIRS', 'ARTS'])
+        self.assertEqual(list(self.dawg.iter_prefix('', 3)), ['AIR', 'ART'])
+        self.assertEqual(list(self.dawg.iter_prefix('BUTTE', 5)), ['BUTTE'])
+        self.assertEqual(list(self.dawg.iter_prefix('BUTTE', 4)), [])
+        self.assertEqual(list(self.dawg.iter_prefix('A', 7)), [])
+
+    def test_lengths(self):
+        self.assertEqual(self.dawg.lengths(), [3, 4, 5, 6])
+        self.assertEqual(self.dawg.lengths('A'), [3, 4, 5])
+        self.assertEqual(self.dawg.lengths('BU'), [5, 6])
+        self.assertEqual(self.dawg.lengths('Z'), [])
+
+    def test_children(self):
+        self.assertEqual(self.dawg.children(), 'ABT')
+        self.assertEqual(self.dawg.children('A'), 'CIPRS')
+        self.assertEqual(self.dawg.children('Z'), '')
+
+
+class DawgTestSerialization(unittest.TestCase):
+    def test_roundtrip(self):
+        dawg = Dawg.build(WORDS)
+        loaded = Dawg.from_bytes(dawg.to_bytes())
+        self.assertEqual(list(loaded), WORDS)
+        self.assertEqual(len(loaded), len(WORDS))
+        self.assertEqual(loaded.lengths('T'), [5, 6])
+
+    def test_roundtrip_memoryview(self):
+        data = memoryview(Dawg.build(WORDS).to_bytes())
+        self.assertEqual(list(Dawg.from_bytes(data)), WORDS)
+
+    def test_not_a_dawg(self):
+        with self.assertRaises(DawgException):
+            Dawg.from_bytes(b'ASPIC\nANNEE\n' * 3)
+        with self.assertRaises(DawgException):
+            Dawg.from_bytes(b'MOTUS')
+        with self.assertRaises(DawgException):
+            Dawg.from_bytes(Dawg.build(WORDS).to_bytes()[:-3])
+
+
+if __name__ == '__main__':
+    unittest.main()
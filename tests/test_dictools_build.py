@@ -0,0 +1,160 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from motus.dictools import CompactDic, Dic, PipelineStage, Reader, build, main
+
+
+class DictoolsTestPipelineStage(unittest.TestCase):
+    def test_pipeline_stage(self):
+        stage = PipelineStage('read', ['ASPIC', 'ANNEE'])
+        self.assertEqual(list(stage), ['ASPIC', 'ANNEE'])
+        self.assertEqual(stage.name, 'read')
+        self.assertEqual(stage.count, 2)
+        self.assertGreater(stage.elapsed, 0)
+
+    def test_pipeline_stage_lazy(self):
+        words = iter(['ASPIC', 'ANNEE'])
+        stage = PipelineStage('read', words)
+        self.assertEqual(next(iter(stage)), 'ASPIC')
+        self.assertEqual(next(words), 'ANNEE')
+
+
+class DictoolsTestSortDic(unittest.TestCase):
+    def test_sort_dic(self):
+        d = Dic.from_iterable(['ZEBRE', 'MOUCHE', 'ASPIC', 'ANNEE', 'AB'])
+        bucket = d.content[5]['A']
+        d.sort()
+        self.assertEqual(list(d.words),
+                         ['AB', 'ANNEE', 'ASPIC', 'ZEBRE', 'MOUCHE'])
+        self.assertIs(d.content[5]['A'], bucket)
+
+    def test_sort_dic_one_bucket(self):
+        d = Dic.from_iterable(['ASPIC', 'ANNEE'])
+        d.sort()
+        self.assertEqual(list(d.words), ['ANNEE', 'ASPIC'])
+        self.assertEqual(d.state, 'list of words')
+        d = Dic.from_iterable(['BALLE', 'ASPIC'])
+        d.sort()
+        self.assertEqual(d.content, {'A': ['ASPIC'], 'B': ['BALLE']})
+        self.assertEqual(d.state, 'various-initials dict')
+
+    def test_sort_compact_dic(self):
+        d = CompactDic.from_dic(Dic.from_iterable(['ZEBRE', 'ASPIC',
+                                                   'ANNEE']))
+        d.sort()
+        self.assertEqual(list(d.words), ['ANNEE', 'ASPIC', 'ZEBRE'])
+
+
+class DictoolsTestBuildBasic(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = tmp_dir.name
+        self.inputs = [self._path('a.txt'), self._path('b.txt.gz')]
+        with open(self.inputs[0], 'w') as file:
+            file.write('zèbre\nAspic\naspic\nab\nballe\n'
+                       'anticonstitutionnellement\n')
+        with gzip.open(self.inputs[1], 'wt') as file:
+            file.write('mouche\nballe\nécrin\n')
+        self.config = self._path('subs.txt')
+        with open(self.config, 'w') as file:
+            file.write('É E\nÈ E\n')
+        self.output = self._path('out.txt')
+
+    def _path(self, name):
+        return os.path.join(self.dir, name)
+
+    def _output(self):
+        with open(self.output) as file:
+            return file.read().split()
+
+
+class DictoolsTestBuild(DictoolsTestBuildBasic):
+    def test_build(self):
+        stats = build(self.inputs, self.output, config=self.config)
+        self.assertEqual(sorted(self._output()), [
+            'ASPIC', 'BALLE', 'ECRIN', 'MOUCHE', 'ZEBRE'])
+        self.assertEqual([stage[:3] for stage in stats], [
+            ('read', 9, 9),
+            ('filter', 9, 7),
+            ('dedupe', 7, 5),
+            ('write', 5, 5),
+        ])
+        for stage in stats:
+            self.assertGreaterEqual(stage[3], 0)
+
+    def test_build_sort(self):
+        stats = build(self.inputs, self.output, config=self.config,
+                      sort=True)
+        self.assertEqual(self._output(), [
+            'ASPIC', 'BALLE', 'ECRIN', 'ZEBRE', 'MOUCHE'])
+        self.assertEqual([stage[0] for stage in stats],
+                         ['read', 'filter', 'dedupe', 'sort', 'write'])
+
+    def test_build_sort_layout(self):
+        source = self._path('words.txt')
+        with open(source, 'w') as file:
+            file.write('aspic\nannee\n')
+        for sort in (False, True):
+            output = self._path(f'out-{sort}.yml')
+            build([source], output, sort=sort)
+            self.assertEqual(Reader(output).parse().state, 'list of words')
+
+    def test_build_lengths(self):
+        build(self.inputs, self.output, config=self.config, minlength=2,
+              maxlength=5)
+        self.assertEqual(sorted(self._output()), [
+            'AB', 'ASPIC', 'BALLE', 'ECRIN', 'ZEBRE'])
+
+    def test_build_output_format(self):
+        output = self._path('out.mdic')
+        build(self.inputs, output, config=self.config)
+        self.assertIn('MOUCHE', Reader(output).parse())
+
+    def test_build_streams(self):
+        with mock.patch('motus.dictools.Reader.parse') as parse_mock:
+            build(self.inputs, self.output, config=self.config)
+        parse_mock.assert_not_called()
+
+    def test_build_single_dic(self):
+        with mock.patch('motus.dictools.Dic.from_iterable',
+                        wraps=Dic.from_iterable) as from_iterable_mock:
+            build(self.inputs, self.output, config=self.config, sort=True)
+        from_iterable_mock.assert_called_once()
+
+
+class DictoolsTestBuildMain(DictoolsTestBuildBasic):
+    def test_main(self):
+        out = io.StringIO()
+        with mock.patch('sys.stdout', out):
+            res = main(['build', *self.inputs, '-c', self.config,
+                        '--max-length', '5', '--sort', '-o', self.output])
+        self.assertEqual(res, 0)
+        self.assertEqual(self._output(), [
+            'ASPIC', 'BALLE', 'ECRIN', 'ZEBRE'])
+        report = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in report[1:6]],
+                         ['read', 'filter', 'dedupe', 'sort', 'write'])
+        self.assertTrue(report[-1].startswith('peak memory: '))
+
+    def test_main_error(self):
+        err = io.StringIO()
+        with mock.patch('sys.stderr', err):
+            res = main(['build', *self.inputs, '-o', self.output])
+        self.assertEqual(res, 1)
+        self.assertIn('ÈBRE', err.getvalue())
+
+    def test_main_usage(self):
+        with mock.patch('sys.stderr', io.StringIO()):
+            with self.assertRaises(SystemExit):
+                main(['build', *self.inputs])
+            with self.assertRaises(SystemExit):
+                main([])
+
+
+if __name__ == '__main__':
+    unittest.main()
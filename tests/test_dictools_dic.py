@@ -1,7 +1,9 @@
+import copy
 import unittest
 from unittest import mock
 
-from motus.dictools import Dic, new_dic
+from motus.dictools import (CompactDic, DawgDic, Dic, DicStateException,
+                            PositionalIndex, ShardedDic, new_dic)
 
 EMPTY_LIST = []
 LIST_OF_WORDS = ['ASPIC', 'APRES', 'ARRET', 'ACTIF', 'ANNEE']
@@ -103,7 +105,6 @@ class DictoolsTestDicInstanciation(unittest.TestCase):
         self.assertIsInstance(d, Dic)
         self.assertEqual(d.content, {})
         self.assertEqual(d._state_flag, True)
-        self.assertEqual(d._words_flag, True)
 
     def test_dic_init(self):
         self._test_dic_init()
@@ -142,11 +143,11 @@ class DictoolsTestDicWords(unittest.TestCase):
     def _test_dic_words(self, content, predicted):
         self.d = Dic()
         self.d.content = content
-        self.assertTrue(self.d._words_flag)
         self.assertEqual(self.d.content, content)
 
         self.assertEqual(self.d.words, predicted)
-        self.assertFalse(self.d._words_flag)
+        self.assertEqual(len(self.d.words), len(predicted))
+        self.assertEqual(list(self.d.words), predicted)
 
     def test_dict_words(self):
         self._test_dic_words(EMPTY_LIST, EMPTY_LIST)
@@ -158,6 +159,452 @@ class DictoolsTestDicWords(unittest.TestCase):
         with self.assertRaises(TypeError):
             self._test_dic_words(FAKE_FULL_DIC, [])
 
+    def test_dict_words_indexing(self):
+        self.d = Dic()
+        self.d.content = FULL_DIC
+        self.assertEqual(self.d.words[0], 'ASPIC')
+        self.assertEqual(self.d.words[12], 'MOUCHE')
+        self.assertEqual(self.d.words[-1], 'SAUCES')
+        self.assertEqual(self.d.words[3:6], ['ACTIF', 'ANNEE', 'BELLE'])
+        self.assertEqual(self.d.words[::-7], ['SAUCES', 'MOUCHE', 'BELLE'])
+        with self.assertRaises(IndexError):
+            self.d.words[len(LIST_FULL_DIC)]
+        with self.assertRaises(IndexError):
+            self.d.words[-len(LIST_FULL_DIC) - 1]
+
+    def test_dict_words_live(self):
+        self.d = Dic()
+        words = self.d.words
+        self.assertEqual(len(words), 0)
+        for i, word in enumerate(LIST_FULL_DIC):
+            self.d.insert(word)
+            self.assertEqual(len(words), i + 1)
+            self.assertIn(word, words)
+        self.assertEqual(sorted(words), sorted(LIST_FULL_DIC))
+
+
+class DictoolsTestDicExtend(unittest.TestCase):
+    def _test_dic_extend(self, content, words, expected, cls=Dic):
+        d = cls()
+        d.content = copy.deepcopy(content)
+        d.extend(iter(words))
+        self.assertEqual(d.content, expected)
+        return d
+
+    def test_extend_empty(self):
+        self._test_dic_extend(EMPTY_LIST, [], {})
+        self._test_dic_extend(EMPTY_LIST, [None, None], {})
+
+    def test_extend_shapes(self):
+        self._test_dic_extend(EMPTY_LIST, LIST_OF_WORDS, LIST_OF_WORDS)
+        self._test_dic_extend(EMPTY_LIST, LIST_SAME_LENGTH,
+                              DICT_OF_SAME_LENGTH)
+        self._test_dic_extend(EMPTY_LIST, LIST_FULL_DIC, FULL_DIC)
+
+    def test_extend_existing(self):
+        self._test_dic_extend(LIST_OF_WORDS, LIST_SAME_LENGTH[5:],
+                              DICT_OF_SAME_LENGTH)
+        self._test_dic_extend(DICT_OF_SAME_LENGTH, LIST_FULL_DIC[12:],
+                              FULL_DIC)
+        expected = {
+            5: dict(FULL_DIC[5], Z=['ZEBRE']),
+            6: dict(FULL_DIC[6], M=['MOUCHE', 'MAIGRE', 'MIETTE', 'MARRON']),
+        }
+        self._test_dic_extend(FULL_DIC, ['MARRON', 'ZEBRE'], expected)
+
+    def test_extend_deduplicates(self):
+        self._test_dic_extend(EMPTY_LIST, LIST_OF_WORDS * 3, LIST_OF_WORDS)
+        self._test_dic_extend(LIST_OF_WORDS, [None] + LIST_OF_WORDS,
+                              LIST_OF_WORDS)
+
+    def test_extend_matches_insert(self):
+        d = Dic()
+        for word in LIST_FULL_DIC:
+            d.insert(word)
+        self.assertEqual(Dic.from_iterable(LIST_FULL_DIC).content,
+                         d.content)
+
+    def test_extend_compact(self):
+        expected = {5: dict(FULL_DIC[5], Z=['ZEBRE']), 6: FULL_DIC[6]}
+        d = self._test_dic_extend(FULL_DIC, LIST_FULL_DIC + ['ZEBRE'],
+                                  expected, cls=CompactDic)
+        self.assertEqual(len(d.words), len(LIST_FULL_DIC) + 1)
+        d = CompactDic.from_iterable(LIST_FULL_DIC * 2)
+        self.assertIsInstance(d, CompactDic)
+        self.assertEqual(d.content, FULL_DIC)
+
+
+class DictoolsTestDicMembership(unittest.TestCase):
+    def _test_membership(self, cls):
+        d = cls()
+        self.assertNotIn('ABRIS', d)
+        d.content = copy.deepcopy(FULL_DIC)
+        self.assertIn('ASPIC', d)
+        self.assertIn('SAUCES', d)
+        self.assertNotIn('ZEBRE', d)
+        self.assertNotIn('aspic', d)
+        self.assertEqual(d.contains_many(['BELLE', 'ZEBRE', 'MOUCHE', '']),
+                         [True, False, True, False])
+        return d
+
+    def test_membership(self):
+        self._test_membership(Dic)
+
+    def test_membership_compact(self):
+        self._test_membership(CompactDic)
+
+    def test_membership_follows_insert(self):
+        for cls in (Dic, CompactDic):
+            d = self._test_membership(cls)
+            d.insert('ZEBRE')
+            self.assertIn('ZEBRE', d)
+            d.extend(['ZOULOU', 'ABRIS'])
+            self.assertEqual(d.contains_many(['ZOULOU', 'ABRIS', 'ZEBRE']),
+                             [True, True, True])
+
+    def test_membership_follows_content(self):
+        d = self._test_membership(Dic)
+        d.content = ['ZEBRE']
+        self.assertNotIn('ABRIS', d)
+        self.assertIn('ZEBRE', d)
+
+    def test_membership_built_once(self):
+        d = self._test_membership(Dic)
+        with mock.patch('motus.dictools.Dic.words',
+                        new_callable=mock.PropertyMock) as words_mock:
+            self.assertIn('ASPIC', d)
+            d.insert('ZEBRE')
+            self.assertIn('ZEBRE', d)
+            self.assertEqual(words_mock.mock_calls, [])
+
+
+QUERY_WORDS = ['ABACA', 'ARENE', 'ABBES', 'BALSA', 'CANAL', 'SALSA', 'EPEES']
+
+
+def _scan(words, fixed=None, forbidden=None, min_counts=None,
+          max_counts=None, excluded=None):
+    """Answers a query by checking every word, without any index"""
+    def matches(word):
+        return (all(i < len(word) and word[i] == letter
+                    for i, letter in (fixed or {}).items())
+                and not set(forbidden or '') & set(word)
+                and all(word.count(letter) >= count
+                        for letter, count in (min_counts or {}).items())
+                and all(word.count(letter) <= count
+                        for letter, count in (max_counts or {}).items())
+                and not any(i < len(word) and word[i] in letters
+                            for i, letters in (excluded or {}).items()))
+
+    return [word for word in words if matches(word)]
+
+
+class DictoolsTestPositionalIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = PositionalIndex(QUERY_WORDS)
+
+    def _test_query(self, expected, **kwargs):
+        self.assertEqual(self.index.query(**kwargs), expected)
+        self.assertEqual(_scan(QUERY_WORDS, **kwargs), expected)
+
+    def test_query_all(self):
+        self._test_query(QUERY_WORDS)
+
+    def test_query_fixed(self):
+        self._test_query(['ABACA', 'ABBES'], fixed={0: 'A', 1: 'B'})
+        self._test_query(['BALSA', 'CANAL', 'SALSA'], fixed={1: 'A'})
+        self._test_query([], fixed={1: 'Z'})
+        self._test_query([], fixed={5: 'A'})
+
+    def test_query_forbidden(self):
+        self._test_query(['ABACA', 'ARENE', 'CANAL'], forbidden='S')
+        self._test_query(['ARENE'], forbidden=['S', 'B', 'L'])
+
+    def test_query_counts(self):
+        self._test_query(['ABACA', 'BALSA', 'CANAL', 'SALSA'],
+                         min_counts={'A': 2})
+        self._test_query(['ABACA'], min_counts={'A': 3})
+        self._test_query(['BALSA', 'CANAL', 'SALSA'],
+                         min_counts={'A': 2}, max_counts={'A': 2})
+        self._test_query(['EPEES'], max_counts={'A': 0})
+        self._test_query([], min_counts={'Z': 1})
+        self._test_query(QUERY_WORDS, min_counts={'Z': 0})
+
+    def test_query_excluded(self):
+        self._test_query(['ARENE', 'BALSA', 'CANAL', 'SALSA', 'EPEES'],
+                         excluded={1: 'B', 2: ''})
+        self._test_query(['ABACA', 'ABBES', 'EPEES'],
+                         excluded={1: 'AR', 4: 'L'})
+        self._test_query(QUERY_WORDS, excluded={7: 'A'})
+
+    def test_query_combined(self):
+        self._test_query(['CANAL'], fixed={2: 'N'}, forbidden='S',
+                         min_counts={'A': 2})
+        self._test_query(['SALSA'], fixed={0: 'S'}, min_counts={'S': 2},
+                         max_counts={'L': 1})
+
+    def test_query_empty(self):
+        self.assertEqual(PositionalIndex([]).query(fixed={0: 'A'}), [])
+        self.assertEqual(Dic().query(5, forbidden='E'), [])
+
+
+class DictoolsTestDicQuery(unittest.TestCase):
+    def _test_dic_query(self, cls):
+        d = cls()
+        d.content = copy.deepcopy(FULL_DIC)
+        self.assertEqual(d.query(6, fixed={0: 'M'}),
+                         ['MOUCHE', 'MAIGRE', 'MIETTE'])
+        self.assertEqual(d.query(6, min_counts={'E': 2}),
+                         ['MIETTE', 'PIERRE'])
+        self.assertEqual(d.query(5, fixed={2: 'U'}, forbidden='S'),
+                         ['COUPE'])
+        d.insert('BOULE')
+        self.assertEqual(d.query(5, fixed={2: 'U'}, forbidden='S'),
+                         ['BOULE', 'COUPE'])
+        self.assertEqual(d.query(6, min_counts={'E': 3}), [])
+        d.extend(['MELEES'])
+        self.assertEqual(d.query(6, min_counts={'E': 3}), ['MELEES'])
+        self.assertEqual(d.query(7), [])
+
+    def test_dic_query(self):
+        self._test_dic_query(Dic)
+
+    def test_dic_query_compact(self):
+        self._test_dic_query(CompactDic)
+
+    def test_dic_query_shapes(self):
+        d = Dic()
+        d.content = list(QUERY_WORDS[:3])
+        self.assertEqual(d.query(5, fixed={0: 'A'}, max_counts={'B': 0}),
+                         ['ARENE'])
+        d.content = {'A': ['ABACA'], 'B': ['BALSA']}
+        self.assertEqual(d.query(5, min_counts={'A': 2}), ['ABACA', 'BALSA'])
+
+
+class DictoolsTestCompactDic(unittest.TestCase):
+    def _test_compact_content(self, content, expected):
+        d = CompactDic()
+        d.content = content
+        self.assertEqual(d.content, expected)
+        return d
+
+    def test_compact_init(self):
+        d = CompactDic()
+        self.assertIsInstance(d, Dic)
+        self.assertEqual(d.content, {})
+        self.assertEqual(d.state, 'empty')
+        self.assertEqual(d.words, [])
+
+    def test_compact_content(self):
+        self._test_compact_content(EMPTY_LIST, {})
+        self._test_compact_content(LIST_OF_WORDS, {5: {'A': LIST_OF_WORDS}})
+        self._test_compact_content(DICT_OF_SAME_LENGTH,
+                                   {5: DICT_OF_SAME_LENGTH})
+        d = self._test_compact_content(FULL_DIC, FULL_DIC)
+        self.assertEqual(d.state, 'various-lengths dict')
+
+    def test_compact_words(self):
+        d = self._test_compact_content(FULL_DIC, FULL_DIC)
+        self.assertEqual(d.words, LIST_FULL_DIC)
+        self.assertEqual(len(d.words), len(LIST_FULL_DIC))
+        self.assertEqual(d.words[12], 'MOUCHE')
+        self.assertEqual(d.words[-1], 'SAUCES')
+        self.assertEqual(d.words[1:3], ['APRES', 'ARRET'])
+        with self.assertRaises(IndexError):
+            d.words[len(LIST_FULL_DIC)]
+
+    def test_compact_insert(self):
+        d = CompactDic()
+        for word in LIST_FULL_DIC:
+            d.insert(word)
+        d.insert(None)
+        self.assertEqual(d.content, FULL_DIC)
+        self.assertEqual(list(d.content[6]), ['M', 'P', 'S'])
+        self.assertEqual(d.content[6]['P'][1], 'PLUMES')
+
+    def test_compact_views_are_live(self):
+        d = CompactDic()
+        d.content = FULL_DIC
+        block = d.content[5]['B']
+        words = d.words
+        d.insert('BALLE')
+        d.insert('ABRIS')
+        self.assertEqual(block, ['BELLE', 'BIERE', 'BUTTE', 'BALLE'])
+        self.assertEqual(len(words), len(LIST_FULL_DIC) + 2)
+        self.assertEqual(words[5], 'ABRIS')
+
+    def test_compact_from_dic(self):
+        d = Dic()
+        d.content = FULL_DIC
+        self.assertEqual(CompactDic.from_dic(d).content, FULL_DIC)
+
+    def test_compact_insert_failing(self):
+        d = CompactDic()
+        with self.assertRaises(DicStateException):
+            d.insert('ÉCRAN')
+        with self.assertRaises(DicStateException):
+            d.insert('AVEÇ')
+        with self.assertRaises(DicStateException):
+            d.insert('')
+        self.assertEqual(d.state, 'empty')
+        self.assertEqual(d.content, {})
+
+    def test_compact_rejected_leaves_dic(self):
+        d = CompactDic()
+        d.content = FULL_DIC
+        with self.assertRaises(DicStateException):
+            d.insert('AVEÇ')
+        with self.assertRaises(DicStateException):
+            d.extend(['ABRIS', 'ZEBRE', 'AVEÇ'])
+        self.assertEqual(d.state, 'various-lengths dict')
+        self.assertEqual(d.content, FULL_DIC)
+        self.assertNotIn('ABRIS', d)
+        d.extend(['ABRIS'])
+        self.assertIn('ABRIS', d)
+
+    def test_compact_footprint(self):
+        d = Dic()
+        d.content = FULL_DIC
+        self.assertLess(CompactDic.from_dic(d).footprint(), d.footprint())
+
+
+class DictoolsTestDawgDic(unittest.TestCase):
+    def setUp(self):
+        self.d = DawgDic()
+        self.d.content = copy.deepcopy(FULL_DIC)
+
+    def test_dawg_init(self):
+        d = DawgDic()
+        self.assertIsInstance(d, Dic)
+        self.assertEqual(d.content, {})
+        self.assertEqual(d.state, 'empty')
+        self.assertEqual(d.words, [])
+
+    def test_dawg_content(self):
+        self.assertEqual(self.d.state, 'various-lengths dict')
+        self.assertEqual(self.d.content, {
+            length: {initial: sorted(words)
+                     for initial, words in by_initial.items()}
+            for length, by_initial in FULL_DIC.items()
+        })
+        self.assertEqual(list(self.d.content[6]), ['M', 'P', 'S'])
+        with self.assertRaises(KeyError):
+            self.d.content[7]
+        with self.assertRaises(KeyError):
+            self.d.content[6]['A']
+
+    def test_dawg_words(self):
+        self.assertEqual(len(self.d.words), len(LIST_FULL_DIC))
+        self.assertEqual(sorted(self.d.words), sorted(LIST_FULL_DIC))
+        self.assertEqual(self.d.words[0], 'ACTIF')
+
+    def test_dawg_insert(self):
+        self.d.insert('ZEBRE')
+        self.d.insert(None)
+        self.d.extend(['ABRIS', 'ASPIC', None])
+        self.assertIn('ZEBRE', self.d)
+        self.assertEqual(self.d.contains_many(['ABRIS', 'ABRI', 'ASPIC']),
+                         [True, False, True])
+        self.assertEqual(len(self.d.words), len(LIST_FULL_DIC) + 2)
+        self.assertEqual(self.d.content[5]['Z'], ['ZEBRE'])
+
+    def test_dawg_iter_prefix(self):
+        self.assertEqual(list(self.d.iter_prefix('CO')), ['COUPE', 'COUPS'])
+        self.assertEqual(list(self.d.iter_prefix('P', 6)),
+                         ['PIERRE', 'PITRES', 'PLUMES'])
+        d = Dic()
+        d.content = FULL_DIC
+        self.assertEqual(list(d.iter_prefix('P', 6)),
+                         ['PIERRE', 'PLUMES', 'PITRES'])
+        self.assertEqual(list(d.iter_prefix('CO')), ['COUPS', 'COUPE'])
+
+    def test_dawg_query(self):
+        self.assertEqual(self.d.query(6, min_counts={'E': 2}),
+                         ['MIETTE', 'PIERRE'])
+
+    def test_dawg_from_iterable(self):
+        d = DawgDic.from_iterable(reversed(LIST_FULL_DIC))
+        self.assertEqual(sorted(d.words), sorted(LIST_FULL_DIC))
+
+
+class DictoolsTestShardedDic(unittest.TestCase):
+    def setUp(self):
+        self.loader_calls = []
+        self.d = ShardedDic.from_loaders({
+            length: self._loader(length) for length in FULL_DIC
+        })
+
+    def _loader(self, length):
+        def load():
+            self.loader_calls.append(length)
+            d = CompactDic()
+            d.content = {length: FULL_DIC[length]}
+            return d
+        return load
+
+    def test_sharded_init(self):
+        d = ShardedDic()
+        self.assertIsInstance(d, Dic)
+        self.assertEqual(d.content, {})
+        self.assertEqual(d.state, 'empty')
+        self.assertEqual(d.words, [])
+
+    def test_sharded_lazy_content(self):
+        self.assertEqual(self.d.state, 'various-lengths dict')
+        self.assertEqual(list(self.d.content), [5, 6])
+        self.assertEqual(self.loader_calls, [])
+        self.assertEqual(self.d.content[6], FULL_DIC[6])
+        self.assertEqual(self.d.content[6]['P'][1], 'PLUMES')
+        self.assertEqual(self.loader_calls, [6])
+        self.assertEqual(self.d.loaded, [6])
+        with self.assertRaises(KeyError):
+            self.d.content[7]
+
+    def test_sharded_loads_once(self):
+        self.d.content[5]
+        self.d.content[5]
+        self.assertEqual(self.loader_calls, [5])
+        self.assertEqual(self.d.content, FULL_DIC)
+        self.assertEqual(self.loader_calls, [5, 6])
+
+    def test_sharded_membership(self):
+        self.assertIn('PIERRE', self.d)
+        self.assertNotIn('PIERRO', self.d)
+        self.assertNotIn('ABC', self.d)
+        self.assertEqual(self.d.contains_many(['MOUCHE', 'MOUCHA']),
+                         [True, False])
+        self.assertEqual(self.loader_calls, [6])
+
+    def test_sharded_query(self):
+        self.assertEqual(self.d.query(6, min_counts={'E': 2}),
+                         ['MIETTE', 'PIERRE'])
+        self.assertEqual(self.d.query(7), [])
+        self.assertEqual(list(self.d.iter_prefix('P', 6)),
+                         ['PIERRE', 'PLUMES', 'PITRES'])
+        self.assertEqual(self.loader_calls, [6])
+
+    def test_sharded_insert(self):
+        self.d.insert('BALLE')
+        self.d.insert(None)
+        self.d.extend(['ABRIS', 'ASPIC', 'ZOOLOGIE', None])
+        self.assertEqual(self.loader_calls, [5])
+        self.assertEqual(self.d.content[5]['B'][-1], 'BALLE')
+        self.assertEqual(self.d.content[8], {'Z': ['ZOOLOGIE']})
+        self.assertEqual(list(self.d.content), [5, 6, 8])
+        self.assertEqual(len(self.d.words), len(LIST_FULL_DIC) + 3)
+
+    def test_sharded_content_setter(self):
+        d = ShardedDic()
+        d.content = FULL_DIC
+        self.assertEqual(d.content, FULL_DIC)
+        self.assertEqual(d.words, LIST_FULL_DIC)
+        d.content = LIST_OF_WORDS
+        self.assertEqual(d.content, {5: {'A': LIST_OF_WORDS}})
+
+    def test_sharded_footprint(self):
+        empty = self.d.footprint()
+        self.d.content[5]
+        self.assertGreater(self.d.footprint(), empty)
+
 
 if __name__ == '__main__':
     unittest.main()
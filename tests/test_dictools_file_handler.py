@@ -1,10 +1,14 @@
+import gzip
 import io
 import os
 import unittest
 from unittest import mock
 import tempfile
 
+import yaml
+
 from motus import dictools
+from motus.cache import DicCache
 from motus.dictools import FileHandler, Reader, Writer
 
 
@@ -381,6 +385,16 @@ class DictoolsTestReader_GetParser(DictoolsTestReaderBasic):
             self.rd._get_parser('application/x-yaml'),
             mock_yml.assert_called_once_with(self.rd.dic_path)
 
+    def test__get_parser_mdic(self):
+        with mock.patch('motus.dictools.Reader._mdic_parser') as mock_mdic:
+            self.rd._get_parser('application/x-motus-dic'),
+            mock_mdic.assert_called_once_with(self.rd.dic_path)
+
+    def test__get_parser_dawg(self):
+        with mock.patch('motus.dictools.Reader._dawg_parser') as mock_dawg:
+            self.rd._get_parser('application/x-motus-dawg'),
+            mock_dawg.assert_called_once_with(self.rd.dic_path)
+
     def test__get_parser_error(self):
         with self.assertRaises(dictools.FileHandlingException):
             self.rd._get_parser('application/json')
@@ -469,6 +483,117 @@ class DictoolsTestReader_TxtParser(DictoolsTestReaderBasic):
         )
 
 
+class DictoolsTestReaderIterWords(DictoolsTestReaderBasic):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'example.txt')
+        with open(self.path, 'w') as file:
+            file.writelines(FULL_DIC_TXT + ['\n', ' aspic \n'])
+
+    def test_iter_words(self):
+        words = [word.strip() for word in FULL_DIC_TXT] + ['ASPIC']
+        self.assertEqual(list(self.rd.iter_words(self.path)), words)
+
+    def test_iter_words_chunks(self):
+        file = io.StringIO(''.join(FULL_DIC_TXT))
+        with mock.patch('builtins.open', return_value=file):
+            with mock.patch.object(file, 'readlines',
+                                   wraps=file.readlines) as lines_mock:
+                with mock.patch(f'{READER}.CHUNK_SIZE', 12):
+                    words = list(self.rd.iter_words('example.txt'))
+                self.assertEqual(len(words), len(FULL_DIC_TXT))
+                self.assertGreater(lines_mock.call_count, 3)
+                for call in lines_mock.call_args_list:
+                    self.assertEqual(call, mock.call(12))
+        self.assertTrue(file.closed)
+
+    def test_iter_words_closes_file(self):
+        file = io.StringIO(''.join(FULL_DIC_TXT))
+        with mock.patch('builtins.open', return_value=file):
+            words = self.rd.iter_words('example.txt')
+            self.assertEqual(next(words), 'ASPIC')
+            self.assertFalse(file.closed)
+            words.close()
+            self.assertTrue(file.closed)
+
+    def test_iter_words_other_filetypes(self):
+        path = os.path.join(os.path.dirname(self.path), 'example.mdic')
+        dic = dictools.Dic()
+        dic.content = FULL_DIC
+        Writer(path).write(dic)
+        self.assertEqual(list(self.rd.iter_words(path)),
+                         [word.strip() for word in FULL_DIC_TXT])
+
+    def test_iter_words_no_path(self):
+        with self.assertRaises(dictools.FileHandlingException):
+            list(self.rd.iter_words())
+
+
+class DictoolsTestReaderShardedParse(DictoolsTestReaderBasic):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'example.txt')
+        self.lines = (FULL_DIC_TXT + ['\n'] + LIST_OF_WORDS_TXT
+                      + ['écrin\n', 'zèbre\n']) * 3
+        with open(self.path, 'w') as file:
+            file.writelines(self.lines)
+        self.rd.config(self.path)
+        self.rd._substitutions = {'É': 'E', 'È': 'E'}
+
+    def test_shard_offsets(self):
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        for count in (1, 2, 3, 7, 100):
+            offsets = dictools._shard_offsets(self.path, count)
+            self.assertEqual(offsets[0], 0)
+            self.assertEqual(offsets[-1], len(data))
+            self.assertLessEqual(len(offsets) - 1, count)
+            self.assertEqual(offsets, sorted(set(offsets)))
+            for offset in offsets[1:-1]:
+                self.assertEqual(data[offset - 1:offset], b'\n')
+
+    def test_parse_shard(self):
+        offsets = dictools._shard_offsets(self.path, 4)
+        words = []
+        for start, stop in zip(offsets, offsets[1:]):
+            groups = dictools._parse_shard(self.path, start, stop,
+                                           self.rd._substitutions)
+            words.extend(word for by_initial in groups.values()
+                         for bucket in by_initial.values()
+                         for word in bucket)
+        self.assertEqual(sorted(words),
+                         sorted(filter(None, map(self.rd.clean, self.lines))))
+
+    def test_parse_workers(self):
+        expected = self.rd.parse()
+        for workers in (2, 3, 50):
+            d = self.rd.parse(workers=workers)
+            self.assertEqual(d.content, expected.content)
+            self.assertEqual(list(d.words), list(expected.words))
+        self.assertIn('ZEBRE', d)
+
+    def test_parse_workers_errors(self):
+        with open(self.path, 'a') as file:
+            file.write('ça\n')
+        with self.assertRaises(dictools.NonAplhaWordException):
+            self.rd.parse(workers=2)
+
+    def test_parse_workers_ignored(self):
+        with mock.patch(f'{READER}._sharded_txt_parser') as shard_mock:
+            with mock.patch(f'{READER}._get_parser') as mock_get:
+                self.rd.parse('example.yml', workers=4)
+                self.rd.parse(self.path, workers=1)
+            shard_mock.assert_not_called()
+            self.assertEqual(mock_get.call_args_list, [
+                mock.call('application/x-yaml'),
+                mock.call('text/plain'),
+            ])
+
+
 class DictoolsTestReaderClean(DictoolsTestReaderBasic):
     def _test_clean(self, substitutions, word, expected):
         self.rd._substitutions = substitutions
@@ -491,6 +616,43 @@ class DictoolsTestReaderClean(DictoolsTestReaderBasic):
         with self.assertRaises(dictools.NonAplhaWordException):
             self._test_clean({'Ö': 'O'}, 'àpricoté \n', 'APRICOT')
 
+        with self.assertRaises(dictools.NonAplhaWordException):
+            self._test_clean({}, 'ap@ricot', 'APRICOT')
+
+        with self.assertRaises(dictools.NonAplhaWordException):
+            self._test_clean({}, 'apri cot', 'APRICOT')
+
+    def test_clean_z(self):
+        self._test_clean({}, 'zebre\n', 'ZEBRE')
+        self._test_clean({}, 'Zoo', 'ZOO')
+
+    def test_clean_empty(self):
+        self._test_clean({}, ' \n', None)
+        self._test_clean({'X': ''}, 'x\n', None)
+
+    def test_clean_multi_char_subs(self):
+        self._test_clean({'Œ': 'OE', 'É': 'E'}, 'œuvré', 'OEUVRE')
+        self._test_clean({'QU': 'K', 'Q': 'K', 'É': 'E'}, 'équique', 'EKIKE')
+        self._test_clean({'SCH': 'CH', 'SC': 'S'}, 'schisc', 'CHIS')
+
+    def test_clean_subs_single_pass(self):
+        self._test_clean({'A': 'E', 'E': 'I'}, 'BanAnE', 'BENENI')
+        self._test_clean({'AB': 'B', 'B': 'C'}, 'AABB', 'ABC')
+
+    def test_clean_subs_recompiled(self):
+        self._test_clean({'À': 'A'}, 'àpricot', 'APRICOT')
+        self.rd.add_substitution('é', 'e')
+        self.assertEqual(self.rd.clean('àpricoté'), 'APRICOTE')
+        self._test_clean({'À': 'E'}, 'àpricot', 'EPRICOT')
+
+    def test_clean_error_message(self):
+        with self.assertRaisesRegex(dictools.NonAplhaWordException,
+                                    'Unauthorized character É in word'):
+            self._test_clean({}, 'éte', None)
+        with self.assertRaisesRegex(dictools.NonAplhaWordException,
+                                    r"characters \['-', '1'\] in word"):
+            self._test_clean({}, 'a-1', None)
+
 
 class DictoolsTestWriterInstanciation(unittest.TestCase):
     def _test_writer_instanciation(self, *args, **kwargs):
@@ -617,6 +779,14 @@ class DictoolsTestWriterParse(DictoolsTestWriterBasic):
             self.wt.write(self.dic)
             mock_get.assert_called_once_with('application/x-yaml')
 
+    def test_write_calls_writer(self):
+        self.wt.dic_path = 'example.mdic'
+        with mock.patch('motus.dictools.Writer._get_writer') as mock_get:
+            self.wt.write(self.dic)
+            mock_get.assert_called_once_with('application/x-motus-dic')
+            mock_get.return_value.assert_called_once_with(
+                self.dic, 'example.mdic')
+
 
 class DictoolsTestWriter_GetParser(DictoolsTestWriterBasic):
     def test__get_writer_txt(self):
@@ -631,6 +801,18 @@ class DictoolsTestWriter_GetParser(DictoolsTestWriterBasic):
             self.wt._yaml_writer
         )
 
+    def test__get_writer_mdic(self):
+        self.assertEqual(
+            self.wt._get_writer('application/x-motus-dic'),
+            self.wt._mdic_writer
+        )
+
+    def test__get_writer_dawg(self):
+        self.assertEqual(
+            self.wt._get_writer('application/x-motus-dawg'),
+            self.wt._dawg_writer
+        )
+
     def test__get_writer_error(self):
         with self.assertRaises(dictools.FileHandlingException):
             self.wt._get_writer('application/json')
@@ -641,15 +823,13 @@ class TestDictoolsWriterWrite(DictoolsTestWriterBasic):
         super().setUp()
         self.dic = dictools.Dic()
 
-        tmp_handler, tmp_path = tempfile.mkstemp()
-        self.tmp_handler = tmp_handler
-        self.tmp_path = tmp_path
-
-        self.tmp_file = open(tmp_path, 'r')
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_path = os.path.join(tmp_dir.name, 'example')
 
-    def tearDown(self):
-        self.tmp_file.close()
-        os.close(self.tmp_handler)
+    def _written_lines(self):
+        with open(self.tmp_path, 'r') as file:
+            return file.readlines()
 
 
 class TestDictoolsWriterWriteYaml(TestDictoolsWriterWrite):
@@ -660,7 +840,7 @@ class TestDictoolsWriterWriteYaml(TestDictoolsWriterWrite):
         self.wt._yaml_writer(self.dic, self.tmp_path)
 
         self.assertEqual(
-            self.tmp_file.readlines(),
+            self._written_lines(),
             expected_file,
         )
 
@@ -693,6 +873,25 @@ class TestDictoolsWriterWriteYaml(TestDictoolsWriterWrite):
         )
 
 
+class TestDictoolsWriterWriteYamlEmitter(TestDictoolsWriterWrite):
+    def test_write_yaml_like_dump(self):
+        self.dic.content = {
+            2: {'N': ['NO', 'NON'], 'O': ['ON', 'OK']},
+            5: {'É': ['ÉCRIN']},
+        }
+        self.wt._yaml_writer(self.dic, self.tmp_path)
+        self.assertEqual(''.join(self._written_lines()), yaml.dump(
+            self.dic.content, default_flow_style=False))
+        self.assertEqual(Reader(self.tmp_path, 'application/x-yaml')
+                         .parse().content, self.dic.content)
+
+    def test_write_yaml_pure_python(self):
+        self.dic.content = FULL_DIC
+        with mock.patch('motus.dictools.YAML_DUMPER', yaml.Dumper):
+            self.wt._yaml_writer(self.dic, self.tmp_path)
+        self.assertEqual(self._written_lines(), FULL_DIC_YML)
+
+
 class TestDictoolsWriterWriteTxt(TestDictoolsWriterWrite):
     def _test_write_txt(self, filetype, content, expected_file):
         self.dic.content = content
@@ -700,7 +899,7 @@ class TestDictoolsWriterWriteTxt(TestDictoolsWriterWrite):
         self.wt._txt_writer(self.dic, self.tmp_path)
 
         self.assertEqual(
-            self.tmp_file.readlines(),
+            self._written_lines(),
             expected_file,
         )
 
@@ -725,6 +924,12 @@ class TestDictoolsWriterWriteTxt(TestDictoolsWriterWrite):
             DICT_OF_SAME_LENGTH_TXT
         )
 
+    def test_write_txt_batches(self):
+        self.dic.content = FULL_DIC
+        with mock.patch(f'{WRITER}.BATCH_SIZE', 3):
+            self.wt._txt_writer(self.dic, self.tmp_path)
+        self.assertEqual(self._written_lines(), FULL_DIC_TXT)
+
     def test_write_txt_full_dic(self):
         self._test_write_txt(
             'text/plain',
@@ -733,5 +938,345 @@ class TestDictoolsWriterWriteTxt(TestDictoolsWriterWrite):
         )
 
 
+class TestDictoolsMdic(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'example.mdic')
+
+    def _roundtrip(self, content):
+        dic = dictools.Dic()
+        dic.content = content
+        Writer(self.path).write(dic)
+        return Reader(self.path).parse()
+
+    def test_mdic_inferred_filetype(self):
+        self.assertEqual(Reader(self.path).inferred_filetype,
+                         'application/x-motus-dic')
+
+    def test_mdic_roundtrip_empty(self):
+        d = self._roundtrip(EMPTY_LIST)
+        self.assertEqual(d.content, {})
+        self.assertEqual(d.state, 'empty')
+
+    def test_mdic_roundtrip_list(self):
+        d = self._roundtrip(LIST_OF_WORDS)
+        self.assertEqual(d.content, {5: {'A': LIST_OF_WORDS}})
+
+    def test_mdic_roundtrip_full_dic(self):
+        d = self._roundtrip(FULL_DIC)
+        self.assertIsInstance(d, dictools.CompactDic)
+        self.assertEqual(d.content, FULL_DIC)
+        self.assertEqual(d.words, [word.strip() for word in FULL_DIC_TXT])
+
+    def test_mdic_zero_copy(self):
+        d = self._roundtrip(FULL_DIC)
+        self.assertIsInstance(d._buffers[5], memoryview)
+        self.assertEqual(bytes(d.buffer(5, 'B')), b'BELLEBIEREBUTTE')
+        self.assertEqual(bytes(d.buffer(6)), b'MOUCHESAUCES')
+
+    def test_mdic_insert_copies_on_write(self):
+        d = self._roundtrip(FULL_DIC)
+        d.insert('BALLE')
+        d.insert('MARRON')
+        self.assertEqual(d.content[5]['B'], ['BELLE', 'BIERE', 'BUTTE',
+                                             'BALLE'])
+        self.assertEqual(d.content[6]['M'], ['MOUCHE', 'MARRON'])
+        self.assertEqual(Reader(self.path).parse().content, FULL_DIC)
+
+    def test_mdic_not_a_dic(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'ASPIC\nANNEE\n' * 4)
+        with self.assertRaises(dictools.ParsingException):
+            Reader(self.path).parse()
+
+    def test_mdic_empty_file(self):
+        open(self.path, 'wb').close()
+        with self.assertRaises(dictools.ParsingException):
+            Reader(self.path).parse()
+
+
+class TestDictoolsDawg(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'example.dawg')
+
+    def test_dawg_inferred_filetype(self):
+        self.assertEqual(Writer(self.path).inferred_filetype,
+                         'application/x-motus-dawg')
+
+    def test_dawg_roundtrip(self):
+        for cls in (dictools.Dic, dictools.DawgDic):
+            dic = cls()
+            dic.content = FULL_DIC
+            Writer(self.path).write(dic)
+            d = Reader(self.path).parse()
+            self.assertIsInstance(d, dictools.DawgDic)
+            self.assertEqual(sorted(d.words),
+                             sorted(word.strip() for word in FULL_DIC_TXT))
+            self.assertEqual(list(d.iter_prefix('B')),
+                             ['BELLE', 'BIERE', 'BUTTE'])
+
+    def test_dawg_not_a_dawg(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'ASPIC\nANNEE\n' * 4)
+        with self.assertRaises(dictools.ParsingException):
+            Reader(self.path).parse()
+
+
+class TestDictoolsReaderCache(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'example.txt')
+        with open(self.path, 'w') as file:
+            file.writelines(FULL_DIC_TXT)
+        self.cache = DicCache(os.path.join(tmp_dir.name, 'cache'))
+        self.rd = Reader(self.path, cache=self.cache)
+
+    def test_cache_config(self):
+        self.assertIsNone(Reader(self.path).cache)
+        self.assertIsInstance(Reader(self.path, cache=True).cache, DicCache)
+        self.assertIs(self.rd.cache, self.cache)
+
+    def test_cache_miss_then_hit(self):
+        d = self.rd.parse()
+        self.assertIsInstance(d, dictools.CompactDic)
+        self.assertEqual(d.content, FULL_DIC)
+        self.assertEqual(len(self.cache.entries()), 1)
+        with mock.patch(f'{READER}._get_parser') as mock_get:
+            d = Reader(self.path, cache=self.cache).parse()
+        mock_get.assert_not_called()
+        self.assertEqual(d.content, FULL_DIC)
+
+    def test_cache_invalidated_by_source(self):
+        self.rd.parse()
+        with open(self.path, 'a') as file:
+            file.write('BALLE\n')
+        os.utime(self.path, ns=(0, 0))
+        self.assertIn('BALLE', self.rd.parse())
+        self.assertEqual(len(self.cache.entries()), 2)
+
+    def test_cache_invalidated_by_substitutions(self):
+        self.rd.parse()
+        self.rd.add_substitution('E', 'A')
+        self.assertIn('BALLA', self.rd.parse())
+
+    def test_cache_corrupt_entry(self):
+        self.rd.parse()
+        _, _, path = self.cache.entries()[0]
+        with open(path, 'wb') as file:
+            file.write(b'garbage')
+        self.assertEqual(self.rd.parse().content, FULL_DIC)
+
+    def test_cache_unsupported_words(self):
+        path = os.path.join(os.path.dirname(self.path), 'example.yml')
+        with open(path, 'w') as file:
+            file.write("5:\n  É: [ÉCRIN]\n")
+        d = self.rd.parse(path)
+        self.assertEqual(d.content, {5: {'É': ['ÉCRIN']}})
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_cache_skips_binary_formats(self):
+        directory = os.path.dirname(self.path)
+        for name, cls in [('example.dawg', dictools.DawgDic),
+                          ('example.mdic', dictools.CompactDic),
+                          ('example.mdics', dictools.ShardedDic)]:
+            path = os.path.join(directory, name)
+            Writer(path).write(self.rd.parse())
+            self.cache.clear()
+            d = Reader(path, cache=self.cache).parse()
+            self.assertIsInstance(d, cls)
+            self.assertEqual(self.cache.entries(), [])
+            self.assertEqual(list(d.iter_prefix('B')),
+                             ['BELLE', 'BIERE', 'BUTTE'])
+
+    def test_cache_clear(self):
+        self.rd.parse()
+        self.rd.clear_cache()
+        self.assertEqual(self.cache.entries(), [])
+
+
+class TestDictoolsShards(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'example.mdics')
+        self.dic = dictools.Dic()
+        self.dic.content = FULL_DIC
+
+    def test_shards_inferred_filetype(self):
+        self.assertEqual(Reader(self.path).inferred_filetype,
+                         'application/x-motus-shards')
+
+    def test_shards_layout(self):
+        Writer(self.path).write(self.dic)
+        self.assertEqual(sorted(os.listdir(self.path)),
+                         ['5.mdic', '6.mdic'])
+        d = Reader(os.path.join(self.path, '6.mdic')).parse()
+        self.assertEqual(d.content, {6: FULL_DIC[6]})
+
+    def test_shards_roundtrip(self):
+        Writer(self.path).write(self.dic)
+        d = Reader(self.path).parse()
+        self.assertIsInstance(d, dictools.ShardedDic)
+        self.assertEqual(list(d.content), [5, 6])
+        self.assertEqual(d.loaded, [])
+        self.assertEqual(d.content[5], FULL_DIC[5])
+        self.assertEqual(d.loaded, [5])
+        self.assertEqual(d.content, FULL_DIC)
+
+    def test_shards_rewrite(self):
+        Writer(self.path).write(self.dic)
+        d = Reader(self.path).parse()
+        d.insert('BALLE')
+        self.dic.content = {5: FULL_DIC[5]}
+        other = os.path.join(os.path.dirname(self.path), 'other.mdics')
+        Writer(other).write(d)
+        Writer(self.path).write(self.dic)
+        self.assertEqual(os.listdir(self.path), ['5.mdic'])
+        self.assertEqual(Reader(self.path).parse().content,
+                         {5: FULL_DIC[5]})
+        self.assertIn('BALLE', Reader(other).parse())
+
+    def test_shards_ignores_other_files(self):
+        Writer(self.path).write(self.dic)
+        open(os.path.join(self.path, 'README'), 'w').close()
+        self.assertEqual(list(Reader(self.path).parse().content), [5, 6])
+
+    def test_shards_missing_directory(self):
+        with self.assertRaises(dictools.ParsingException):
+            Reader(self.path).parse()
+
+
+class TestDictoolsCompression(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = tmp_dir.name
+        self.dic = dictools.Dic()
+        self.dic.content = FULL_DIC
+
+    def _path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_compression_inferred_from_extension(self):
+        for name, filetype, compression in [
+                ('example.txt', 'text/plain', None),
+                ('example.txt.gz', 'text/plain', 'gzip'),
+                ('example.yml.bz2', 'application/x-yaml', 'bzip2'),
+                ('example.mdic.xz', 'application/x-motus-dic', 'xz'),
+                ('example.dawg.gz', 'application/x-motus-dawg', 'gzip')]:
+            for handler in (Reader(name), Writer(name)):
+                self.assertEqual(handler.inferred_filetype, filetype)
+                self.assertEqual(handler.inferred_compression, compression)
+
+    def test_compression_unsupported(self):
+        with self.assertRaises(dictools.FileHandlingException):
+            Writer('example.txt.Z').write(self.dic)
+
+    def test_compression_inferred_from_magic_number(self):
+        path = self._path('example.txt')
+        with gzip.open(path, 'wt') as file:
+            file.writelines(FULL_DIC_TXT)
+        rd = Reader(path)
+        self.assertEqual(rd.inferred_compression, 'gzip')
+        self.assertEqual(rd.parse().content, FULL_DIC)
+
+    def test_compression_roundtrip(self):
+        for name in ('example.txt.gz', 'example.yml.bz2', 'example.mdic.xz',
+                     'example.dawg.gz', 'example.txt.xz'):
+            path = self._path(name)
+            Writer(path).write(self.dic)
+            with open(path, 'rb') as file:
+                self.assertIsNotNone(
+                    dictools._sniff_compression(file.read(8)), name)
+            d = Reader(path).parse()
+            self.assertEqual(sorted(d.words), sorted(self.dic.words), name)
+
+    def test_compression_iter_words(self):
+        path = self._path('example.txt.bz2')
+        Writer(path).write(self.dic)
+        self.assertEqual(list(Reader(path).iter_words()),
+                         [word.strip() for word in FULL_DIC_TXT])
+
+    def test_compression_no_sharded_parse(self):
+        path = self._path('example.txt.gz')
+        Writer(path).write(self.dic)
+        with mock.patch(f'{READER}._sharded_txt_parser') as shard_mock:
+            d = Reader(path).parse(workers=4)
+        shard_mock.assert_not_called()
+        self.assertEqual(d.content, FULL_DIC)
+
+    def test_decompress(self):
+        data = b'ASPIC\n'
+        self.assertEqual(dictools._decompress(data), data)
+        self.assertEqual(dictools._decompress(gzip.compress(data)), data)
+
+
+class _BrokenDic(dictools.Dic):
+    """Dic failing after its first words were written"""
+    def _failing(self):
+        yield from LIST_OF_WORDS
+        raise RuntimeError
+
+    @property
+    def words(self):
+        return self._failing()
+
+    @property
+    def content(self):
+        return {5: {'A': self._failing()}}
+
+    @content.setter
+    def content(self, content):
+        pass
+
+
+class TestDictoolsWriterAtomic(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = tmp_dir.name
+        self.dic = dictools.Dic()
+        self.dic.content = FULL_DIC
+
+    def test_atomic_failure_keeps_file(self):
+        for name in ('example.txt', 'example.yml', 'example.txt.gz'):
+            path = os.path.join(self.dir, name)
+            Writer(path).write(self.dic)
+            with open(path, 'rb') as file:
+                before = file.read()
+            with mock.patch(f'{WRITER}.BATCH_SIZE', 2):
+                with self.assertRaises(RuntimeError):
+                    Writer(path).write(_BrokenDic())
+            with open(path, 'rb') as file:
+                self.assertEqual(file.read(), before, name)
+        self.assertEqual(sorted(os.listdir(self.dir)), [
+            'example.txt', 'example.txt.gz', 'example.yml'])
+
+    def test_atomic_permissions(self):
+        path = os.path.join(self.dir, 'example.txt')
+        Writer(path).write(self.dic)
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(dictools.UMASK, umask)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~umask)
+
+    def test_atomic_keeps_permissions(self):
+        path = os.path.join(self.dir, 'example.txt')
+        Writer(path).write(self.dic)
+        os.chmod(path, 0o600)
+        Writer(path).write(self.dic)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+    def test_atomic_leaves_umask(self):
+        path = os.path.join(self.dir, 'example.txt')
+        with mock.patch('os.umask') as umask_mock:
+            Writer(path).write(self.dic)
+        umask_mock.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from motus.cache import DicCache
+from motus.dictools import Dic
+from motus.feedback import FeedbackMatrix, code_dtype
+from motus.motus import evaluate_code
+
+WORDS = ['BANANA', 'BOUNTY', 'BNANNA', 'BANANE', 'BAMBOO', 'BIKINI']
+OTHER_WORDS = ['ABACUS', 'AMBRES', 'ANANAS']
+
+
+class FeedbackTestCodeDtype(unittest.TestCase):
+    def test_code_dtype(self):
+        self.assertEqual(code_dtype(1), np.uint8)
+        self.assertEqual(code_dtype(5), np.uint8)
+        self.assertEqual(code_dtype(6), np.uint16)
+        self.assertEqual(code_dtype(10), np.uint16)
+        self.assertEqual(code_dtype(11), np.uint32)
+        self.assertEqual(code_dtype(20), np.uint32)
+        self.assertEqual(code_dtype(25), np.uint64)
+        with self.assertRaises(ValueError):
+            code_dtype(41)
+
+
+class FeedbackTestBuild(unittest.TestCase):
+    def _test_matrix(self, matrix, words):
+        self.assertEqual(len(matrix), len(words))
+        for guess in words:
+            for solution in words:
+                self.assertEqual(
+                    matrix[matrix.index(guess), matrix.index(solution)],
+                    evaluate_code(solution, guess))
+
+    def test_build(self):
+        matrix = FeedbackMatrix.build(WORDS)
+        self.assertEqual(matrix.codes.dtype, np.uint16)
+        self.assertEqual(matrix.codes.shape, (len(WORDS), len(WORDS)))
+        self._test_matrix(matrix, WORDS)
+
+    def test_build_chunks(self):
+        with mock.patch.object(FeedbackMatrix, 'CHUNK_SIZE', 4):
+            self._test_matrix(FeedbackMatrix.build(WORDS), WORDS)
+
+    def test_build_wide_characters(self):
+        words = ['ÉTÉS', 'ÉPÉE', 'ÉMUE']
+        self._test_matrix(FeedbackMatrix.build(words), words)
+
+    def test_build_empty(self):
+        self.assertEqual(FeedbackMatrix.build([]).codes.shape, (0, 0))
+
+    def test_build_lengths(self):
+        with self.assertRaises(ValueError):
+            FeedbackMatrix.build(['ASPIC', 'ANNEES'])
+
+    def test_build_initials(self):
+        with self.assertRaises(ValueError):
+            FeedbackMatrix.build(WORDS + OTHER_WORDS)
+
+    def test_build_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'feedback.npy')
+            matrix = FeedbackMatrix.build(WORDS, path)
+            self.assertIsInstance(matrix.codes, np.memmap)
+            loaded = np.load(path)
+            self.assertTrue((loaded == FeedbackMatrix.build(WORDS).codes)
+                            .all())
+            del matrix, loaded
+
+    def test_nbytes(self):
+        self.assertEqual(FeedbackMatrix.nbytes(WORDS), 2 * len(WORDS) ** 2)
+        self.assertEqual(FeedbackMatrix.nbytes(WORDS),
+                         FeedbackMatrix.build(WORDS).codes.nbytes)
+        self.assertEqual(FeedbackMatrix.nbytes([]), 0)
+
+    def test_ids(self):
+        matrix = FeedbackMatrix.build(WORDS)
+        self.assertEqual(matrix.ids(['BAMBOO', 'BANANA']).tolist(), [4, 0])
+        with self.assertRaises(KeyError):
+            matrix.index('ZEBRES')
+
+
+class FeedbackTestCache(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache = DicCache(tmp_dir.name)
+
+    def test_cached(self):
+        matrix = FeedbackMatrix.cached(WORDS, self.cache)
+        self.assertEqual(len(self.cache.entries()), 1)
+        with mock.patch.object(FeedbackMatrix, 'build') as build_mock:
+            cached = FeedbackMatrix.cached(WORDS, self.cache)
+        build_mock.assert_not_called()
+        self.assertIsInstance(cached.codes, np.memmap)
+        self.assertTrue((cached.codes == matrix.codes).all())
+
+    def test_cached_by_words(self):
+        FeedbackMatrix.cached(WORDS, self.cache)
+        FeedbackMatrix.cached(WORDS[::-1], self.cache)
+        self.assertEqual(len(self.cache.entries()), 2)
+
+    def test_cached_corrupt(self):
+        FeedbackMatrix.cached(WORDS, self.cache)
+        _, _, path = self.cache.entries()[0]
+        with open(path, 'wb') as file:
+            file.write(b'garbage')
+        matrix = FeedbackMatrix.cached(WORDS, self.cache)
+        self.assertEqual(matrix.codes.shape, (len(WORDS), len(WORDS)))
+
+    def test_cached_too_large(self):
+        # 18 bytes of codes fit in a quarter of the cache, 72 do not
+        cache = DicCache(self.cache.directory, max_size=100)
+        FeedbackMatrix.cached(OTHER_WORDS, cache)
+        self.assertEqual(len(cache.entries()), 1)
+        matrix = FeedbackMatrix.cached(WORDS, cache)
+        self.assertNotIsInstance(matrix.codes, np.memmap)
+        self.assertEqual(len(matrix), len(WORDS))
+        self.assertEqual(len(cache.entries()), 1)
+
+    def test_from_dic(self):
+        d = Dic()
+        d.content = WORDS + OTHER_WORDS + ['ASPIC']
+        matrix = FeedbackMatrix.from_dic(d, 6, 'B', self.cache)
+        self.assertEqual(sorted(matrix.words), sorted(WORDS))
+        self.assertEqual(len(self.cache.entries()), 1)
+        matrix = FeedbackMatrix.from_dic(d, 5, 'A', False)
+        self.assertEqual(matrix.words, ['ASPIC'])
+        self.assertEqual(len(self.cache.entries()), 1)
+
+    def test_blocks(self):
+        d = Dic()
+        d.content = WORDS + OTHER_WORDS + ['ASPIC']
+        blocks = FeedbackMatrix.blocks(d, 6, self.cache)
+        self.assertEqual(sorted(blocks), ['A', 'B'])
+        self.assertEqual(sorted(blocks['A'].words), OTHER_WORDS)
+        self.assertEqual(len(self.cache.entries()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
 import unittest
 from unittest import mock
 
-from motus.motus import SoloGame, SoloRound, evaluate
+import numpy as np
+
+from motus.dictools import CompactDic, Dic
+from motus import motus, player
+from motus.motus import (SoloGame, SoloRound, decode_hint, encode_hint,
+                         encode_words, evaluate, evaluate_batch,
+                         evaluate_code, hint_table, letter_counts,
+                         right_code)
 
 
 class SoloGameTestInstanciation(unittest.TestCase):
@@ -62,6 +71,28 @@ class SoloRoundTestInstanciation(SoloRoundTestBasic):
             rd = SoloRound(self.sg, 8)
             pick_mock.assert_called_once_with()
             self.assertEqual(rd.wordlength, 8)
+            self.assertFalse(rd.validate)
+
+
+class SoloRoundTestPromptGuess(SoloRoundTestBasic):
+    def _test_prompt_guess(self, validate, guesses, expected, rejected):
+        self.sg.dic = Dic.from_iterable(['BANANA', 'BAMBOO', 'BIKINI'])
+        self.sg.player = mock.Mock()
+        self.sg.player.guess.side_effect = guesses
+        with mock.patch('motus.motus.Round.pick_solution'):
+            rd = SoloRound(self.sg, 6, validate)
+        with mock.patch('motus.motus.UI.invalid_guess') as invalid_mock:
+            self.assertEqual(rd.prompt_guess(), expected)
+            self.assertEqual(invalid_mock.call_args_list,
+                             [mock.call(guess) for guess in rejected])
+
+    def test_prompt_guess_no_validation(self):
+        self._test_prompt_guess(False, ['BXXXXX'], 'BXXXXX', [])
+
+    def test_prompt_guess_validation(self):
+        self._test_prompt_guess(True, ['BIKINI'], 'BIKINI', [])
+        self._test_prompt_guess(True, ['BXXXXX', 'BANAN', 'BAMBOO'],
+                                'BAMBOO', ['BXXXXX', 'BANAN'])
 
 
 class TestEvaluation(unittest.TestCase):
@@ -89,5 +120,173 @@ class TestEvaluation(unittest.TestCase):
         self._test_evaluation('BANANA', 'PINEAPPLE', False, 'WWWWWW')
 
 
+class TestHintCode(unittest.TestCase):
+    def test_encode_hint(self):
+        self.assertEqual(encode_hint(''), 0)
+        self.assertEqual(encode_hint('WWWWW'), 0)
+        self.assertEqual(encode_hint('RRRRR'), right_code(5))
+        self.assertEqual(encode_hint('MWR'), 1 + 2 * 9)
+
+    def test_decode_hint(self):
+        self.assertEqual(decode_hint(0, 5), 'WWWWW')
+        self.assertEqual(decode_hint(right_code(3), 3), 'RRR')
+        self.assertEqual(decode_hint(1 + 2 * 9, 3), 'MWR')
+        self.assertEqual(decode_hint(right_code(12), 12), 'R' * 12)
+
+    def test_decode_hint_without_table(self):
+        for wordlength in (1, 4, 6):
+            with mock.patch.object(motus, 'HINT_TABLE_MAXLENGTH', 0):
+                decoded = [decode_hint(code, wordlength)
+                           for code in range(3 ** wordlength)]
+            self.assertEqual(tuple(decoded), hint_table(wordlength))
+
+    def test_hint_table(self):
+        self.assertEqual(hint_table(0), ('',))
+        self.assertEqual(hint_table(2), ('WW', 'MW', 'RW', 'WM', 'MM', 'RM',
+                                         'WR', 'MR', 'RR'))
+        for code, hints in enumerate(hint_table(5)):
+            self.assertEqual(encode_hint(hints), code)
+
+
+class TestEvaluateCode(unittest.TestCase):
+    def test_evaluate_code(self):
+        self.assertEqual(evaluate_code('BANANA', 'BANANA'), right_code(6))
+        self.assertEqual(evaluate_code('BANANA', 'BOUNTY'),
+                         encode_hint('RWWMWW'))
+        self.assertEqual(evaluate_code('BANANA', 'BNANNA'),
+                         encode_hint('RMMWRR'))
+        self.assertEqual(evaluate_code('BANANA', 'BONANZA'), 0)
+        self.assertEqual(evaluate_code('BANANA', 'APPLES'), 0)
+
+    def test_evaluate_code_random(self):
+        rng = random.Random(0)
+        for _ in range(2000):
+            wordlength = rng.randint(1, 7)
+            solution, guess = (
+                'B' + ''.join(rng.choice('ABC') for _ in range(wordlength))
+                for _ in range(2))
+            code = evaluate_code(solution, guess)
+            self.assertEqual(code, evaluate_batch(encode_words([solution]),
+                                                  guess)[0])
+            self.assertEqual(evaluate(solution, guess),
+                             (solution == guess, decode_hint(code,
+                                                             wordlength + 1)))
+
+
+class TestEncodeWords(unittest.TestCase):
+    def test_encode_words(self):
+        codes = encode_words(['BANANA', 'BOUNTY'])
+        self.assertEqual(codes.dtype, np.uint8)
+        self.assertEqual(codes.shape, (2, 6))
+        self.assertEqual(bytes(codes[1]), b'BOUNTY')
+
+    def test_encode_words_empty(self):
+        self.assertEqual(encode_words([], 6).shape, (0, 6))
+
+    def test_encode_words_wide(self):
+        codes = encode_words(['ŒUF', 'ÉTÉ'])
+        self.assertEqual(codes.dtype, np.uint32)
+        self.assertEqual(codes[0, 0], ord('Œ'))
+
+
+class TestEvaluateBatch(unittest.TestCase):
+    SOLUTIONS = ['BANANA', 'BOUNTY', 'BNANNA', 'APPLES', 'BANANE']
+
+    def _test_evaluate_batch(self, solutions, guess):
+        codes = evaluate_batch(encode_words(solutions), guess)
+        self.assertEqual(codes.tolist(), [
+            encode_hint(evaluate(solution, guess)[1])
+            for solution in solutions])
+
+    def test_evaluate_batch(self):
+        for guess in self.SOLUTIONS + ['BONANZA', 'PINEAPPLE', 'BÉBÉES']:
+            self._test_evaluate_batch(self.SOLUTIONS, guess)
+
+    def test_evaluate_batch_duplicates(self):
+        self._test_evaluate_batch(['BAAAB', 'BBAAA', 'BABAB'], 'BBBAA')
+        self._test_evaluate_batch(['BAAAB', 'BBAAA', 'BABAB'], 'BAAAA')
+
+    def test_evaluate_batch_random(self):
+        rng = random.Random(0)
+        for wordlength in range(1, 8):
+            solutions = [''.join(rng.choice('ABC') for _ in range(wordlength))
+                         for _ in range(200)]
+            for _ in range(20):
+                guess = ''.join(rng.choice('ABCD')
+                                for _ in range(wordlength))
+                self._test_evaluate_batch(solutions, guess)
+
+    def test_evaluate_batch_counts(self):
+        solutions = encode_words(self.SOLUTIONS[:3] + self.SOLUTIONS[4:])
+        counts = letter_counts(solutions)
+        self.assertEqual(counts.shape, (4, 256))
+        self.assertEqual(counts[0, ord('A')], 3)
+        for guess in self.SOLUTIONS:
+            self.assertEqual(
+                evaluate_batch(solutions, guess, counts).tolist(),
+                evaluate_batch(solutions, guess).tolist())
+
+    def test_evaluate_batch_empty(self):
+        self.assertEqual(evaluate_batch(encode_words([], 5), 'ASPIC').shape,
+                         (0,))
+
+    def test_evaluate_batch_compact_buffer(self):
+        d = CompactDic()
+        d.content = ['BANANA', 'BOUNTY', 'BIKINI']
+        solutions = np.frombuffer(d.buffer(6, 'B'), dtype=np.uint8)
+        codes = evaluate_batch(solutions.reshape(-1, 6), 'BOUNTY')
+        self.assertEqual(codes.tolist(), [
+            encode_hint(evaluate(word, 'BOUNTY')[1]) for word in d.words])
+
+
+class TestMemo(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(motus.disable_memo)
+
+    def test_memo_disabled(self):
+        self.assertIsNone(motus.memo_info())
+        motus.clear_memo()
+        self.assertEqual(evaluate_code('BANANA', 'BOUNTY'),
+                         encode_hint('RWWMWW'))
+
+    def test_memo_hits(self):
+        motus.enable_memo()
+        self.assertEqual(evaluate('BANANA', 'BOUNTY'), (False, 'RWWMWW'))
+        self.assertEqual(evaluate('BANANA', 'BOUNTY'), (False, 'RWWMWW'))
+        self.assertTrue(player.Player.matches('BANANA', 'BOUNTY', 'RWWMWW'))
+        info = motus.memo_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 1, 1))
+
+    def test_memo_bounded(self):
+        motus.enable_memo(2)
+        for guess in ('BOUNTY', 'BANANE', 'BAMBOO', 'BOUNTY'):
+            evaluate_code('BANANA', guess)
+        info = motus.memo_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (0, 4, 2))
+
+    def test_memo_clear(self):
+        motus.enable_memo()
+        evaluate_code('BANANA', 'BOUNTY')
+        motus.clear_memo()
+        self.assertEqual(motus.memo_info().currsize, 0)
+        motus.enable_memo(10)
+        self.assertEqual(motus.memo_info().maxsize, 10)
+        motus.disable_memo()
+        self.assertIsNone(motus.memo_info())
+
+    def test_memo_threads(self):
+        motus.enable_memo(64)
+        rng = random.Random(0)
+        pairs = [('B' + ''.join(rng.choice('ABC') for _ in range(4)),
+                  'B' + ''.join(rng.choice('ABC') for _ in range(4)))
+                 for _ in range(500)]
+        expected = [motus._compute_code(*pair) for pair in pairs]
+        with ThreadPoolExecutor(4) as pool:
+            for _ in range(4):
+                codes = pool.map(lambda pair: evaluate_code(*pair), pairs)
+                self.assertEqual(list(codes), expected)
+        self.assertLessEqual(motus.memo_info().currsize, 64)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,13 @@
+import math
+import pickle
 import unittest
 
-from motus.player import (BotPlayer, HumanPlayer, Player,
-                          RandomStrategy, Strategy)
+from motus import motus
+from motus.dictools import Dic
+from motus.player import (BotPlayer, Constraint, EntropyStrategy,
+                          ExpectedSizeStrategy, HumanPlayer, MinimaxStrategy,
+                          PartitionStrategy, Player, RandomStrategy,
+                          SolverState, Strategy, _partition_scores)
 
 
 class PlayerTestInstanciation(unittest.TestCase):
@@ -28,11 +34,153 @@ class PlayerTestMatches(unittest.TestCase):
         self._test_matches('BANANA', 'BOUNTY', 'RWWWMW', False)
 
 
-class PlayerTestClassMethods(unittest.TestCase):
+class PlayerTestGiveHint(unittest.TestCase):
+    def setUp(self):
+        self.player = BotPlayer(RandomStrategy())
+
     def test_give_hint_1(self):
-        Player.universe = ['BANANA', 'BAMBOO', 'BIKINI', 'BOUNTY']
-        Player.give_hint('BOUNTY', 'RWWMWW')
-        self.assertAlmostEqual(Player.universe, ['BANANA', 'BIKINI'])
+        self.player.universe = ['BANANA', 'BAMBOO', 'BIKINI', 'BOUNTY']
+        self.player.give_hint('BOUNTY', 'RWWMWW')
+        self.assertEqual(self.player.universe, ('BANANA', 'BIKINI'))
+
+    def test_give_hint_lengths(self):
+        self.player.universe = ['BANANA', 'BANANAS', 'BIKINI', 'BOUNTY',
+                                'ABACUS']
+        self.player.give_hint('BOUNTY', 'RWWMWW')
+        self.assertEqual(self.player.universe, ('BANANA', 'BIKINI'))
+        self.player.give_hint('BOUNTYS', 'RWWMWW')
+        self.assertEqual(self.player.universe, ())
+
+    def test_give_hint_same_as_matches(self):
+        words = ['BANANA', 'BNANNA', 'BANANE', 'BAMBOO', 'BOUNTY', 'ABACUS']
+        for guess in words:
+            for solution in words:
+                hint = motus.evaluate(solution, guess)[1]
+                self.player.universe = list(words)
+                self.player.give_hint(guess, hint)
+                self.assertEqual(self.player.universe, tuple(
+                    word for word in words
+                    if Player.matches(word, guess, hint)))
+
+    def test_players_are_independent(self):
+        words = ['BANANA', 'BAMBOO', 'BIKINI', 'BOUNTY']
+        other = BotPlayer(RandomStrategy(), SolverState(words))
+        self.player.universe = words
+        self.player.give_hint('BOUNTY', 'RWWMWW')
+        self.assertEqual(other.universe, tuple(words))
+        self.assertEqual(other.state.history, ())
+
+
+class PlayerTestSolverState(unittest.TestCase):
+    def setUp(self):
+        self.state = SolverState(['BANANA', 'BAMBOO', 'BIKINI', 'BOUNTY'])
+
+    def test_give_hint(self):
+        self.state.give_hint('BOUNTY', 'RWWMWW')
+        self.assertEqual(self.state.candidates, ('BANANA', 'BIKINI'))
+        self.assertEqual(len(self.state), 2)
+        self.assertEqual(self.state.history, (('BOUNTY', 'RWWMWW'),))
+        self.state.give_hint('BIKINI', 'RWWWRW')
+        self.assertEqual(self.state.candidates, ('BANANA',))
+        self.assertEqual(len(self.state.history), 2)
+        self.assertTrue(self.state.constraint('BANANA'))
+        self.assertFalse(self.state.constraint('BIKINI'))
+
+    def test_fork_shares_candidates(self):
+        fork = self.state.fork()
+        self.assertIs(fork.candidates, self.state.candidates)
+        fork.give_hint('BOUNTY', 'RWWMWW')
+        self.assertEqual(len(self.state), 4)
+        self.assertEqual(self.state.history, ())
+        self.assertIsNone(self.state.constraint)
+        self.assertEqual(len(fork), 2)
+
+    def test_after(self):
+        state = self.state.after('BOUNTY', 'RWWMWW')
+        self.assertEqual(state.candidates, ('BANANA', 'BIKINI'))
+        self.assertEqual(len(self.state), 4)
+        self.assertEqual(state.after('BIKINI', 'RWWWRW').candidates,
+                         ('BANANA',))
+        self.assertEqual(state.candidates, ('BANANA', 'BIKINI'))
+
+
+CONSTRAINT_WORDS = ['BANANA', 'BNANNA', 'BANANE', 'BAMBOO', 'BOUNTY',
+                    'BIKINI', 'ABACUS', 'BANAN', 'BONBON']
+
+
+class PlayerTestConstraint(unittest.TestCase):
+    def _expected(self, *rules):
+        return [word for word in CONSTRAINT_WORDS
+                if all(len(word) == len(hint)
+                       and Player.matches(word, guess, hint)
+                       for guess, hint in rules)]
+
+    def test_from_hint(self):
+        c = Constraint.from_hint('BOUNTY', 'RWWMWW')
+        self.assertEqual(c.fixed, {0: 'B'})
+        self.assertEqual(c.excluded[3], {'N'})
+        self.assertEqual(c.min_counts, {'B': 1, 'N': 1})
+        self.assertEqual(c.max_counts['O'], 0)
+        self.assertEqual(c.filter(CONSTRAINT_WORDS),
+                         ['BANANA', 'BANANE', 'BIKINI'])
+
+    def test_from_hint_counts(self):
+        c = Constraint.from_hint('BNANNA', 'RMMWRW')
+        self.assertEqual(c.min_counts['N'], 2)
+        self.assertEqual(c.max_counts, {'N': 2, 'A': 1})
+
+    def test_from_hint_same_as_matches(self):
+        for guess in CONSTRAINT_WORDS:
+            for solution in CONSTRAINT_WORDS:
+                hint = motus.evaluate(solution, guess)[1]
+                for length in (5, 6):
+                    hint = (hint + 'W')[:length]
+                    c = Constraint.from_hint(guess, hint)
+                    self.assertEqual(c.filter(CONSTRAINT_WORDS),
+                                     self._expected((guess, hint)))
+
+    def test_impossible_hints(self):
+        for guess, hint in [('BOUNTY', 'MWWWWW'), ('BOUNTY', 'WRWWWW'),
+                            ('BANANA', 'RWWWRM'), ('BOUNTYS', 'RWWMWW')]:
+            c = Constraint.from_hint(guess, hint)
+            self.assertFalse(c.satisfiable)
+            self.assertEqual(c.filter(CONSTRAINT_WORDS), [])
+            self.assertFalse(c.matches('BANANA'))
+
+    def test_invalid_hint(self):
+        with self.assertRaises(ValueError):
+            Constraint.from_hint('BANANA', 'RRRXRR')
+
+    def test_other_initial(self):
+        c = Constraint.from_hint('BOUNTY', 'WWWWWW')
+        self.assertEqual(c.filter(CONSTRAINT_WORDS), ['ABACUS'])
+
+    def test_merge(self):
+        rules = [('BOUNTY', 'RWWMWW'), ('BIKINI', 'RWWWRW')]
+        c = Constraint.from_hint(*rules[0]) & Constraint.from_hint(*rules[1])
+        self.assertEqual(c.filter(CONSTRAINT_WORDS), self._expected(*rules))
+        self.assertEqual(c.filter(CONSTRAINT_WORDS), ['BANANA', 'BANANE'])
+        self.assertTrue(c('BANANA'))
+        self.assertFalse(c('BIKINI'))
+
+    def test_merge_conflicts(self):
+        c = Constraint.from_hint('BANANA', 'RRWWWW')
+        self.assertFalse((c & Constraint.from_hint('BONBON', 'RRWWWW'))
+                         .satisfiable)
+        self.assertFalse((c & Constraint.from_hint('BANAN', 'RRWWW'))
+                         .satisfiable)
+        self.assertFalse((c & Constraint(6, min_counts={'A': 2}))
+                         .satisfiable)
+
+    def test_query(self):
+        d = Dic.from_iterable(CONSTRAINT_WORDS)
+        rules = [('BOUNTY', 'RWWMWW'), ('BANANE', 'RRRRRW')]
+        c = Constraint.from_hint(*rules[0])
+        self.assertEqual(sorted(c.query(d)), ['BANANA', 'BANANE', 'BIKINI'])
+        c &= Constraint.from_hint(*rules[1])
+        self.assertEqual(c.query(d), ['BANANA'])
+        self.assertEqual(
+            Constraint.from_hint('BOUNTYS', 'RWWMWW').query(d), [])
 
 
 class HumanPlayerTestInstanciation(unittest.TestCase):
@@ -50,6 +198,14 @@ class BotPlayerTestInstatnciation(unittest.TestCase):
         self.assertIsInstance(BotPlayer(strat), (BotPlayer, Player))
 
 
+class BotPlayerTestGuess(unittest.TestCase):
+    def test_guess_in_candidates(self):
+        bot = BotPlayer(RandomStrategy(),
+                        SolverState(['BANANA', 'BAMBOO', 'BIKINI']))
+        bot.give_hint('BOUNTY', 'RWWMWW')
+        self.assertIn(bot.guess(), ('BANANA', 'BIKINI'))
+
+
 class StrategyTestInit(unittest.TestCase):
     def test_init(self):
         with self.assertRaises(TypeError):
@@ -61,10 +217,115 @@ class RandomStrategyTestInit(unittest.TestCase):
         self.assertIsInstance(RandomStrategy(), RandomStrategy, Strategy)
 
 
+class StrategyTestRepr(unittest.TestCase):
+    def test_repr_is_stable(self):
+        self.assertEqual(repr(RandomStrategy()), 'RandomStrategy()')
+        self.assertEqual(repr(EntropyStrategy(seed=3)),
+                         repr(EntropyStrategy(seed=3, workers=2)))
+        self.assertNotEqual(repr(EntropyStrategy(seed=3)),
+                            repr(EntropyStrategy()))
+        self.assertNotEqual(repr(EntropyStrategy()),
+                            repr(MinimaxStrategy()))
+
+
 class RandomStrategyTestGuess(unittest.TestCase):
     def setUp(self):
         self.strat = RandomStrategy()
 
     def test_guess_in_universe(self):
         universe = ['BANANA', 'BAMBOO', 'BIKINI', 'BOUNTY']
-        self.assertIn(self.strat.guess(universe), universe)
\ No newline at end of file
+        self.assertIn(self.strat.guess(universe), universe)
+
+
+ENTROPY_WORDS = ['BANANA', 'BANANE', 'BAMBOO', 'BIKINI', 'BOUNTY', 'BONBON',
+                 'BOUGIE', 'BRANDI']
+
+
+def _play(strategy, solution):
+    state = SolverState(ENTROPY_WORDS)
+    for turn in range(1, len(ENTROPY_WORDS) + 1):
+        guess = strategy.guess(state.candidates)
+        right, hint = motus.evaluate(solution, guess)
+        if right:
+            return turn
+        state.give_hint(guess, hint)
+
+
+class PartitionStrategyTestInit(unittest.TestCase):
+    def test_init_abc(self):
+        with self.assertRaises(TypeError):
+            PartitionStrategy()
+
+
+class PartitionStrategyTestScores(unittest.TestCase):
+    def setUp(self):
+        self.solutions = motus.encode_words(['BANANA', 'BANANE', 'BIKINI'])
+
+    def _test_scores(self, strategy, expected):
+        scores = _partition_scores(strategy, self.solutions,
+                                   ['BANANA', 'BIKINI', 'BOUNTY'])
+        for score, right_score in zip(scores, expected):
+            self.assertAlmostEqual(score, right_score)
+
+    def test_entropy(self):
+        self._test_scores(EntropyStrategy(), [
+            math.log2(3), 2 / 3 * math.log2(3 / 2) + 1 / 3 * math.log2(3), 0])
+
+    def test_minimax(self):
+        self._test_scores(MinimaxStrategy(), [-1, -2, -3])
+
+    def test_expected_size(self):
+        self._test_scores(ExpectedSizeStrategy(), [-1, -5 / 3, -3])
+
+
+class PartitionStrategyTestGuess(unittest.TestCase):
+    strategies = [EntropyStrategy, MinimaxStrategy, ExpectedSizeStrategy]
+
+    def test_guess_is_best(self):
+        solutions = motus.encode_words(ENTROPY_WORDS)
+        for cls in self.strategies:
+            strategy = cls()
+            guess = strategy.guess(ENTROPY_WORDS)
+            self.assertIn(guess, ENTROPY_WORDS)
+            self.assertEqual(
+                _partition_scores(strategy, solutions, [guess])[0],
+                max(_partition_scores(strategy, solutions, ENTROPY_WORDS)))
+
+    def test_guess_small_universe(self):
+        for cls in self.strategies:
+            self.assertEqual(cls().guess(('BIKINI', 'BANANA')), 'BIKINI')
+
+    def test_finds_solutions(self):
+        for cls in self.strategies:
+            strategy = cls()
+            for solution in ENTROPY_WORDS:
+                self.assertLessEqual(_play(strategy, solution), 4)
+
+    def test_sampling_is_seeded(self):
+        strategy = EntropyStrategy(max_guesses=3, max_solutions=4, seed=7)
+        guesses = {strategy.guess(ENTROPY_WORDS) for _ in range(5)}
+        self.assertEqual(len(guesses), 1)
+        self.assertEqual(guesses,
+                         {EntropyStrategy(3, 4, seed=7).guess(ENTROPY_WORDS)})
+
+    def test_workers(self):
+        solutions = motus.encode_words(ENTROPY_WORDS)
+        with MinimaxStrategy(workers=2) as strategy:
+            strategy.PARALLEL_MIN_EVALUATIONS = 0
+            self.assertEqual(
+                list(strategy.scores(solutions, ENTROPY_WORDS)),
+                list(_partition_scores(strategy, solutions, ENTROPY_WORDS)))
+        self.assertIsNone(strategy._pool)
+
+    def test_workers_pool_reused(self):
+        strategy = EntropyStrategy(workers=2)
+        self.addCleanup(strategy.close)
+        strategy.PARALLEL_MIN_EVALUATIONS = 0
+        first = strategy.guess(ENTROPY_WORDS)
+        pool = strategy._pool
+        self.assertIsNotNone(pool)
+        self.assertEqual(strategy.guess(ENTROPY_WORDS[1:]),
+                         EntropyStrategy().guess(ENTROPY_WORDS[1:]))
+        self.assertIs(strategy._pool, pool)
+        self.assertEqual(first, EntropyStrategy().guess(ENTROPY_WORDS))
+        self.assertIsNone(pickle.loads(pickle.dumps(strategy))._pool)
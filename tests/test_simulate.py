@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from motus import simulate
+from motus.book import OpeningBook
+from motus.dictools import Dic
+from motus.player import EntropyStrategy, RandomStrategy
+
+WORDS = ['BANANA', 'BANANE', 'BAMBOO', 'BIKINI', 'BOUNTY', 'BONBON',
+         'BOUGIE', 'BRANDI', 'ABACUS', 'ANANAS', 'AMBRES', 'ASPIC', 'AMBRE']
+
+
+def _turns(report, length):
+    return report['lengths'][str(length)]['guesses']
+
+
+class SimulateTestPlayRound(unittest.TestCase):
+    def test_win(self):
+        turn, latencies = simulate.play_round(EntropyStrategy(), WORDS[:8],
+                                              'BRANDI')
+        self.assertLessEqual(turn, 4)
+        self.assertEqual(len(latencies), turn)
+
+    def test_lost(self):
+        first = EntropyStrategy().guess(WORDS[:8])
+        solution = next(word for word in WORDS[:8] if word != first)
+        turn, latencies = simulate.play_round(EntropyStrategy(), WORDS[:8],
+                                              solution, guesses=1)
+        self.assertIsNone(turn)
+        self.assertEqual(len(latencies), 1)
+
+    def test_book(self):
+        strategy = EntropyStrategy()
+        book = OpeningBook.build(strategy, [WORDS[:8]])
+        with mock.patch.object(EntropyStrategy, 'guess') as guess_mock:
+            simulate.play_round(strategy, WORDS[:8], WORDS[0], book=book)
+        guess_mock.assert_not_called()
+
+
+class SimulateTestSampleSolutions(unittest.TestCase):
+    def test_seeded(self):
+        universes = {'A': ['ABACUS', 'AMBRES'], 'B': ['BANANA']}
+        solutions = simulate.sample_solutions(universes, 20,
+                                              random.Random(1))
+        self.assertEqual(simulate.sample_solutions(universes, 20,
+                                                   random.Random(1)),
+                         solutions)
+        self.assertEqual(len(solutions), 20)
+        self.assertEqual(set(solutions), {'ABACUS', 'AMBRES', 'BANANA'})
+
+
+class SimulateTestSimulate(unittest.TestCase):
+    def setUp(self):
+        self.dic = Dic.from_iterable(WORDS)
+
+    def test_report(self):
+        report = simulate.simulate(self.dic, EntropyStrategy(), [5, 6], 40)
+        self.assertEqual(set(report['lengths']), {'5', '6'})
+        for summary in list(report['lengths'].values()) + [report['total']]:
+            self.assertEqual(summary['wins'], summary['rounds'])
+            self.assertEqual(summary['win_rate'], 1.0)
+            self.assertEqual(sum(summary['guesses'].values()),
+                             summary['rounds'])
+            self.assertEqual(set(summary['latency_ms']),
+                             {'p50', 'p90', 'p99', 'max'})
+            self.assertGreater(summary['games_per_second'], 0)
+        self.assertEqual(report['total']['rounds'], 80)
+        self.assertEqual(_turns(report, 5)['1'] + _turns(report, 5)['2'],
+                         40)
+        json.dumps(report)
+
+    def test_lost_rounds(self):
+        report = simulate.simulate(self.dic, EntropyStrategy(), [6], 40,
+                                   guesses=1)
+        summary = report['total']
+        self.assertLess(summary['wins'], 40)
+        self.assertEqual(summary['guesses']['lost'], 40 - summary['wins'])
+
+    def test_missing_length(self):
+        report = simulate.simulate(self.dic, EntropyStrategy(), [9], 10)
+        self.assertEqual(report['total']['rounds'], 0)
+        self.assertEqual(report['total']['win_rate'], 0.0)
+        self.assertEqual(report['total']['latency_ms'], {})
+
+    def test_seeded(self):
+        for strategy in (EntropyStrategy(), RandomStrategy()):
+            first = simulate.simulate(self.dic, strategy, [6], 70, seed=5)
+            second = simulate.simulate(self.dic, strategy, [6], 70, seed=5)
+            self.assertEqual(_turns(first, 6), _turns(second, 6))
+
+    def test_strategy_is_stable(self):
+        for cls in (EntropyStrategy, RandomStrategy):
+            first = simulate.simulate(self.dic, cls(), [6], 5)
+            second = simulate.simulate(self.dic, cls(), [6], 5)
+            self.assertEqual(first['strategy'], second['strategy'])
+        self.assertEqual(first['strategy'], 'RandomStrategy()')
+
+    def test_workers(self):
+        for strategy in (EntropyStrategy(), RandomStrategy()):
+            report = simulate.simulate(self.dic, strategy, [6], 70, seed=5)
+            pooled = simulate.simulate(self.dic, strategy, [6], 70, seed=5,
+                                       workers=2)
+            self.assertEqual(pooled['workers'], 2)
+            self.assertEqual(_turns(pooled, 6), _turns(report, 6))
+
+
+class SimulateTestMain(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.dir = tmp_dir.name
+        self.dic_path = os.path.join(self.dir, 'words.txt')
+        with open(self.dic_path, 'w') as file:
+            file.write('\n'.join(WORDS))
+        patcher = mock.patch.dict(os.environ, {'MOTUS_CACHE_DIR': self.dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_main(self):
+        output = os.path.join(self.dir, 'report.json')
+        self.assertEqual(simulate.main([self.dic_path, '-l', '6', '-n', '5',
+                                        '--book', '-o', output]), 0)
+        with open(output) as file:
+            report = json.load(file)
+        self.assertEqual(report['total']['rounds'], 5)
+        self.assertTrue(report['strategy'].startswith('EntropyStrategy('))
+
+    def test_main_stdout(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            self.assertEqual(simulate.main(
+                [self.dic_path, '-l', '5', '6', '-n', '3', '-s', 'random']),
+                0)
+        self.assertEqual(json.loads(stdout.getvalue())['total']['rounds'], 6)
+
+    def test_main_random_book(self):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            simulate.main([self.dic_path, '-l', '6', '-s', 'random',
+                           '--book'])
+
+    def test_main_missing_file(self):
+        with redirect_stderr(io.StringIO()):
+            self.assertEqual(simulate.main(
+                [os.path.join(self.dir, 'missing.txt'), '-l', '6']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
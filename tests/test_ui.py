@@ -236,6 +236,14 @@ class UITestDisplaySolution(UITestDisplay):
         )
 
 
+class UITestInvalidGuess(UITestDisplay):
+    def test_invalid_guess(self):
+        self._test_display_basic(
+            UI.invalid_guess, 'BXXXXX',
+            expected_res="BXXXXX is not in the dictionary, try another word."
+        )
+
+
 class UITestRightGuess(UITestDisplay):
     def test_right_guess_short(self):
         self._test_display_basic(